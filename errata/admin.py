@@ -82,4 +82,4 @@ admin.site.register(StagedErratum, StagedErratumAdmin)
 
 @admin.register(DirtyBits)
 class DirtyBitsAdmin(admin.ModelAdmin):
-    list_display = ["slug", "dirty_time", "processed_time"]
+    list_display = ["slug", "dirty_time", "processed_time", "processed_digest"]
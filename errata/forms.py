@@ -4,6 +4,7 @@ import re
 from django import forms
 
 from .models import RfcMetadata, Erratum
+from .utils import ERRATUM_JSON_KEYS
 
 STATUS_CHOICES = [
     ("any", "All/Any"),
@@ -66,14 +67,29 @@ class ErrataSearchForm(forms.Form):
     submitter_name = forms.CharField(
         max_length=80, required=False, label="Submitter Name"
     )
+    verifier_name = forms.CharField(
+        max_length=80, required=False, label="Verifier Name"
+    )
     stream = forms.ChoiceField(
         choices=STREAM_CHOICES, required=False, label="Stream", initial="any"
     )  # Labeled "Other" in previous errata app
+    source = forms.CharField(
+        max_length=255,
+        required=False,
+        label="Source of RFC",
+        help_text='As shown with results, e.g. "IAB" or "httpbis (art)"',
+    )
     date = forms.CharField(
         required=False,
         label="Date Submitted",
         widget=forms.TextInput(attrs={"placeholder": "YYYY-MM-DD, YYYY-MM, or YYYY"}),
     )
+    text = forms.CharField(
+        max_length=200,
+        required=False,
+        label="Text",
+        help_text="Words in the section, original or corrected text, or notes",
+    )
     presentation = forms.ChoiceField(
         choices=PRESENTATION_CHOICES,
         required=False,
@@ -89,6 +105,35 @@ class ErrataSearchForm(forms.Form):
         return date_str
 
 
+SEARCH_API_FORMAT_CHOICES = [
+    ("ndjson", "Newline-delimited JSON"),
+    ("json", "JSON"),
+]
+
+
+class ErrataSearchApiForm(ErrataSearchForm):
+    """ErrataSearchForm plus the output options of the search API"""
+
+    fields = forms.CharField(
+        required=False,
+        help_text="Comma-separated errata.json keys to include; default all",
+    )
+    format = forms.ChoiceField(choices=SEARCH_API_FORMAT_CHOICES, required=False)
+
+    def clean_fields(self):
+        fields_str = self.cleaned_data["fields"]
+        if fields_str.strip() == "":
+            return ERRATUM_JSON_KEYS
+        fields = [field.strip() for field in fields_str.split(",")]
+        unknown = [field for field in fields if field not in ERRATUM_JSON_KEYS]
+        if len(unknown) > 0:
+            raise forms.ValidationError(f"Unknown fields: {', '.join(unknown)}")
+        return fields
+
+    def clean_format(self):
+        return self.cleaned_data["format"] or "ndjson"
+
+
 class ChooseRfcForm(forms.Form):
     rfc_number = forms.IntegerField(required=True, label="RFC Number")
 
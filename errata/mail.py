@@ -9,11 +9,11 @@ from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.template.loader import render_to_string
 
-from errata.utils import counts_per_authority
+from errata.utils import AUTHORITIES, count_errata_per_authority
 from errata_auth.models import User
 from errata_auth.utils import is_rpc
 
-from .models import MailMessage, RfcMetadata
+from .models import MERGED_AREAS, MailMessage, RfcMetadata
 from .templatetags.filters import txt_errata_verifying_party
 from .tasks import send_mail_task
 
@@ -42,8 +42,8 @@ def get_ad_emails(erratum):
     target_acronym = None
     if metadata.area_assignment != "":
         target_acronym = metadata.area_assignment
-    elif metadata.area_acronym in ["rai", "app"]:
-        target_acronym = "art"
+    elif metadata.area_acronym in MERGED_AREAS:
+        target_acronym = MERGED_AREAS[metadata.area_acronym]
     elif metadata.group_acronym == "none":
         target_acronym = "gen"
     else:
@@ -319,20 +319,6 @@ def send_erratum_classified_notification(erratum, user):
 def build_monthly_report(moment: datetime.datetime = None):
     if moment is None:
         moment = datetime.datetime.now(datetime.UTC)
-    ordered_authorities = [
-        "art",
-        "gen",
-        "int",
-        "ops",
-        "rtg",
-        "sec",
-        "wit",
-        "iab",
-        "ise",
-        "irtf",
-        "legacy",
-        "editorial",
-    ]
     search_links = {}
     for authority in ["art", "gen", "int", "ops", "rtg", "sec", "wit"]:
         search_links[authority] = (
@@ -342,9 +328,11 @@ def build_monthly_report(moment: datetime.datetime = None):
         search_links[authority] = (
             f"{settings.BASE_URL}/search/?status=reported&errata_type=technical&stream={authority}&presentation=records"
         )
-    authority_counts = counts_per_authority()
+    authority_counts = count_errata_per_authority(
+        statuses=["reported"], erratum_types=["technical"]
+    )
     authority_data = []
-    for authority in ordered_authorities:
+    for authority in AUTHORITIES:
         authority_data.append(
             {
                 "authority": authority,
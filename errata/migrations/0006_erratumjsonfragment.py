@@ -0,0 +1,29 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0005_alter_dirtybits_slug_and_options"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ErratumJsonFragment",
+            fields=[
+                (
+                    "erratum",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="json_fragment",
+                        serialize=False,
+                        to="errata.erratum",
+                    ),
+                ),
+                ("fragment", models.TextField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0006_erratumjsonfragment"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dirtybits",
+            name="processed_digest",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
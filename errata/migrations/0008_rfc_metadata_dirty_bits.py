@@ -0,0 +1,35 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+def forward(apps, schema_editor):
+    DirtyBits = apps.get_model("errata", "DirtyBits")
+    DirtyBits.objects.create(slug="rfc_metadata", dirty_time=None, processed_time=None)
+
+
+def reverse(apps, schema_editor):
+    DirtyBits = apps.get_model("errata", "DirtyBits")
+    DirtyBits.objects.filter(slug="rfc_metadata").delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0007_dirtybits_processed_digest"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dirtybits",
+            name="slug",
+            field=models.CharField(
+                choices=[
+                    ("errata_json", "Errata JSON"),
+                    ("rfc_metadata", "RFC metadata"),
+                ],
+                max_length=40,
+                unique=True,
+            ),
+        ),
+        migrations.RunPython(forward, reverse),
+    ]
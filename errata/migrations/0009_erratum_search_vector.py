@@ -0,0 +1,31 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0008_rfc_metadata_dirty_bits"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="erratum",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "section", "orig_text", "corrected_text", "notes", config="english"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="errata_erratum_search_idx"
+            ),
+        ),
+    ]
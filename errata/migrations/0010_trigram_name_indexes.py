@@ -0,0 +1,56 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0009_erratum_search_vector"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("submitter_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="errata_erratum_submitter_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("verifier_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="errata_erratum_verifier_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stagederratum",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("submitter_name"),
+                    name="gin_trgm_ops",
+                ),
+                name="errata_staged_submitter_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stagederratum",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("submitter_email"),
+                    name="gin_trgm_ops",
+                ),
+                name="errata_staged_email_trgm",
+            ),
+        ),
+    ]
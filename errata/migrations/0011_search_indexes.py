@@ -0,0 +1,88 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0010_trigram_name_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="erratum",
+            name="erratum_type",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="erratum_type_slug",
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="erratum",
+                to="errata.erratumtype",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="erratum",
+            name="status",
+            field=models.ForeignKey(
+                db_column="status_slug",
+                db_index=False,
+                default="reported",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="erratum",
+                to="errata.status",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=models.Index(
+                fields=["status", "rfc_number"], name="errata_erratum_status_rfc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=models.Index(
+                fields=["rfc_number", "status"], name="errata_erratum_rfc_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=models.Index(
+                fields=["erratum_type", "status"], name="errata_erratum_type_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="erratum",
+            index=models.Index(
+                fields=["submitted_at"], name="errata_erratum_submitted_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfcmetadata",
+            index=models.Index(
+                fields=["stream", "area_acronym", "area_assignment"],
+                name="errata_rfcmeta_stream_area_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfcmetadata",
+            index=models.Index(
+                fields=["area_acronym", "area_assignment"],
+                name="errata_rfcmeta_area_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfcmetadata",
+            index=models.Index(
+                fields=["area_assignment"], name="errata_rfcmeta_assignment_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfcmetadata",
+            index=models.Index(
+                fields=["group_acronym"], name="errata_rfcmeta_group_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+def forward(apps, schema_editor):
+    DirtyBits = apps.get_model("errata", "DirtyBits")
+    DirtyBits.objects.create(slug="errata", dirty_time=None, processed_time=None)
+
+
+def reverse(apps, schema_editor):
+    DirtyBits = apps.get_model("errata", "DirtyBits")
+    DirtyBits.objects.filter(slug="errata").delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0011_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dirtybits",
+            name="slug",
+            field=models.CharField(
+                choices=[
+                    ("errata_json", "Errata JSON"),
+                    ("rfc_metadata", "RFC metadata"),
+                    ("errata", "Errata"),
+                ],
+                max_length=40,
+                unique=True,
+            ),
+        ),
+        migrations.RunPython(forward, reverse),
+    ]
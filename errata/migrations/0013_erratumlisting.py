@@ -0,0 +1,102 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# errata.models.UNTYPED_ORDER as of this migration
+UNTYPED_ORDER = 2**31 - 1
+
+
+def rfc_display_source(stream, group_acronym, area_acronym, area_assignment=""):
+    """errata.models.rfc_display_source() as of this migration"""
+    if stream == "ise":
+        result = "INDEPENDENT"
+    elif stream == "iab":
+        result = "IAB"
+    elif stream == "ietf" and (group_acronym in ["none", "gen"] or area_acronym == ""):
+        result = "IETF - NON WORKING GROUP"
+    elif group_acronym != "none":
+        result = group_acronym
+        if stream == "ietf" and area_acronym != "":
+            result += f" ({area_acronym})"
+        elif stream != "":
+            result += f" ({stream})"
+    elif stream != "":
+        if stream == "legacy":
+            result = "Legacy"
+        else:
+            result = stream.upper()
+    else:
+        result = ""
+    if area_assignment != "":
+        result += f" ({area_assignment})"
+    return result
+
+
+def forward(apps, schema_editor):
+    Erratum = apps.get_model("errata", "Erratum")
+    ErratumListing = apps.get_model("errata", "ErratumListing")
+    listings = []
+    for erratum in Erratum.objects.select_related(
+        "status", "erratum_type", "rfc_metadata"
+    ).iterator():
+        rfc = erratum.rfc_metadata
+        listings.append(
+            ErratumListing(
+                erratum=erratum,
+                rfc_number=erratum.rfc_number,
+                status_name=erratum.status.name,
+                status_order=erratum.status.order,
+                erratum_type_name=(
+                    erratum.erratum_type.name if erratum.erratum_type else ""
+                ),
+                type_order=(
+                    erratum.erratum_type.order
+                    if erratum.erratum_type
+                    else UNTYPED_ORDER
+                ),
+                source=rfc_display_source(
+                    rfc.stream, rfc.group_acronym, rfc.area_acronym, rfc.area_assignment
+                ),
+            )
+        )
+    ErratumListing.objects.bulk_create(listings, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0012_errata_dirty_bits"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ErratumListing",
+            fields=[
+                (
+                    "erratum",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="listing",
+                        serialize=False,
+                        to="errata.erratum",
+                    ),
+                ),
+                ("rfc_number", models.PositiveIntegerField()),
+                ("status_name", models.CharField(max_length=255)),
+                ("status_order", models.PositiveIntegerField()),
+                ("erratum_type_name", models.CharField(blank=True, max_length=255)),
+                ("type_order", models.PositiveIntegerField()),
+                ("source", models.CharField(blank=True, max_length=255)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status_order", "rfc_number", "type_order", "erratum"],
+                        name="errata_listing_order_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,79 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def rfc_display_source(stream, group_acronym, area_acronym, area_assignment=""):
+    """errata.models.rfc_display_source() as of this migration"""
+    if stream == "ise":
+        result = "INDEPENDENT"
+    elif stream == "iab":
+        result = "IAB"
+    elif stream == "ietf" and (group_acronym in ["none", "gen"] or area_acronym == ""):
+        result = "IETF - NON WORKING GROUP"
+    elif group_acronym != "none":
+        result = group_acronym
+        if stream == "ietf" and area_acronym != "":
+            result += f" ({area_acronym})"
+        elif stream != "":
+            result += f" ({stream})"
+    elif stream != "":
+        if stream == "legacy":
+            result = "Legacy"
+        else:
+            result = stream.upper()
+    else:
+        result = ""
+    if area_assignment != "":
+        result += f" ({area_assignment})"
+    return result
+
+
+def forward(apps, schema_editor):
+    RfcMetadata = apps.get_model("errata", "RfcMetadata")
+    rfcs = list(RfcMetadata.objects.all())
+    for rfc in rfcs:
+        rfc.display_source = rfc_display_source(
+            rfc.stream, rfc.group_acronym, rfc.area_acronym
+        )
+    RfcMetadata.objects.bulk_update(rfcs, ["display_source"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0013_erratumlisting"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rfcmetadata",
+            name="display_source",
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(forward, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="rfcmetadata",
+            index=models.Index(
+                django.db.models.functions.text.Upper("display_source"),
+                name="errata_rfcmeta_source_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="rfcmetadata",
+            name="display_source_with_assignment",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(area_assignment="", then=models.F("display_source")),
+                    default=django.db.models.functions.text.Concat(
+                        "display_source",
+                        models.Value(" ("),
+                        "area_assignment",
+                        models.Value(")"),
+                    ),
+                ),
+                output_field=models.CharField(max_length=255),
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0014_rfcmetadata_display_source"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="rfcmetadata",
+            name="errata_rfcmeta_area_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="rfcmetadata",
+            name="errata_rfcmeta_assignment_idx",
+        ),
+        migrations.AddField(
+            model_name="rfcmetadata",
+            name="authority",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(area_assignment="app", then=models.Value("art")),
+                    models.When(area_assignment="rai", then=models.Value("art")),
+                    models.When(
+                        models.Q(("area_assignment", ""), _negated=True),
+                        then=models.F("area_assignment"),
+                    ),
+                    models.When(
+                        stream__in=["iab", "ise", "irtf", "editorial", "legacy"],
+                        then=models.F("stream"),
+                    ),
+                    models.When(area_acronym="app", then=models.Value("art")),
+                    models.When(area_acronym="rai", then=models.Value("art")),
+                    default=models.F("area_acronym"),
+                ),
+                output_field=models.CharField(max_length=40),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rfcmetadata",
+            index=models.Index(
+                fields=["authority"], name="errata_rfcmeta_authority_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0015_rfcmetadata_authority"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="historicalerratum",
+            index=models.Index(
+                fields=["id", "history_date"], name="errata_erratum_pit_idx"
+            ),
+        ),
+    ]
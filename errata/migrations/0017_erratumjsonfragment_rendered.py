@@ -0,0 +1,22 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0016_historicalerratum_pit_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="erratumjsonfragment",
+            name="rendered_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddField(
+            model_name="erratumjsonfragment",
+            name="rendered_from",
+            field=models.DateTimeField(null=True),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Copyright The IETF Trust 2026, All Rights Reserved
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("errata", "0017_erratumjsonfragment_rendered"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="erratumlisting",
+            name="source",
+        ),
+    ]
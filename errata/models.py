@@ -5,6 +5,7 @@ import uuid
 
 from collections.abc import Iterable
 from email.policy import EmailPolicy
+from functools import lru_cache
 
 from simple_history.models import HistoricalRecords
 
@@ -12,7 +13,13 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.forms import SimpleArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Concat, Upper
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 
 from errata_project.mail import make_message_id, EmailMessage
@@ -31,6 +38,51 @@ class Name(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Republish the errata that show this name
+
+        Subclasses are referenced by Erratum with related_name="erratum".
+        """
+        super().save(*args, **kwargs)
+        ErratumListing.refresh(self.erratum.all())
+        # errata.json shows the name; the next refresh re-renders the errata
+        # that have no stored fragment
+        ErratumJsonFragment.objects.filter(erratum__in=self.erratum.all()).delete()
+        DirtyBits.objects.filter(
+            slug__in=[DirtyBits.Slugs.ERRATA_JSON, DirtyBits.Slugs.ERRATA]
+        ).update(dirty_time=datetime.datetime.now(datetime.UTC))
+
+
+class PointInTimeHistoricalRecords(HistoricalRecords):
+    """HistoricalRecords with an index for finding each object's version at a time
+
+    The (id, history_date) index serves the DISTINCT ON query of
+    errata.utils.errata_as_of().
+    """
+
+    def get_meta_options(self, model):
+        meta_fields = super().get_meta_options(model)
+        pk_name = model._meta.pk.attname
+        meta_fields["indexes"] = [
+            *meta_fields.get("indexes", []),
+            models.Index(
+                fields=[pk_name, "history_date"],
+                name=f"{model._meta.app_label}_{model._meta.model_name}_pit_idx",
+            ),
+        ]
+        return meta_fields
+
+
+class ErratumManager(models.Manager):
+    """Leaves out Erratum.search_vector, which only database queries use
+
+    The tsvector is about as large as the erratum's text, and no page, export
+    or cache needs it loaded.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
 
 class Erratum(models.Model):
     """
@@ -44,12 +96,15 @@ class Erratum(models.Model):
         on_delete=models.PROTECT,
         null=False,
     )
+    # status and erratum_type lead the composite indexes in Meta, so they do
+    # not need single-column indexes of their own
     status = models.ForeignKey(
         "Status",
         on_delete=models.PROTECT,
         default="reported",
         related_name="erratum",
         db_column="status_slug",
+        db_index=False,
     )
     erratum_type = models.ForeignKey(
         "ErratumType",
@@ -58,6 +113,7 @@ class Erratum(models.Model):
         db_column="erratum_type_slug",
         null=True,
         blank=True,
+        db_index=False,
     )
     section = models.TextField(blank=True)
     orig_text = models.TextField(blank=True)
@@ -80,7 +136,16 @@ class Erratum(models.Model):
         blank=True,
         help_text="A list of formats. Possible values: 'HTML', 'PDF', and 'TXT'.",
     )
-    history = HistoricalRecords()
+    # Full-text search document, computed by the database
+    search_vector = models.GeneratedField(
+        expression=SearchVector(
+            "section", "orig_text", "corrected_text", "notes", config="english"
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    history = PointInTimeHistoricalRecords(excluded_fields=["search_vector"])
+    objects = ErratumManager()
 
     def __str__(self):
         return f"Erratum {self.id} for RFC {self.rfc_number}"
@@ -91,9 +156,10 @@ class Erratum(models.Model):
         if not getattr(self, "_take_given_updated_at_value", False):
             self.updated_at = timezone.now()
         super().save(*args, **kwargs)
-        DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA_JSON).update(
-            dirty_time=datetime.datetime.now(datetime.UTC)
-        )
+        ErratumListing.refresh(Erratum.objects.filter(pk=self.pk))
+        DirtyBits.objects.filter(
+            slug__in=[DirtyBits.Slugs.ERRATA_JSON, DirtyBits.Slugs.ERRATA]
+        ).update(dirty_time=datetime.datetime.now(datetime.UTC))
         # Keeping this as proof_of_concept, but as the app is currently written,
         # updated_at will change on every save in production, so the extra calculation
         # here is unnecessary.
@@ -133,19 +199,69 @@ class Erratum(models.Model):
 
     class Meta:
         verbose_name_plural = "Errata"
+        indexes = [
+            models.Index(
+                fields=["status", "rfc_number"], name="errata_erratum_status_rfc_idx"
+            ),
+            models.Index(
+                fields=["rfc_number", "status"], name="errata_erratum_rfc_status_idx"
+            ),
+            models.Index(
+                fields=["erratum_type", "status"], name="errata_erratum_type_idx"
+            ),
+            models.Index(fields=["submitted_at"], name="errata_erratum_submitted_idx"),
+            GinIndex(fields=["search_vector"], name="errata_erratum_search_idx"),
+            # Trigram indexes serve the UPPER(...) LIKE of icontains lookups
+            # as well as similarity searches
+            GinIndex(
+                OpClass(Upper("submitter_name"), name="gin_trgm_ops"),
+                name="errata_erratum_submitter_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("verifier_name"), name="gin_trgm_ops"),
+                name="errata_erratum_verifier_trgm",
+            ),
+        ]
+
+
+@receiver(post_delete, sender=Erratum)
+def _erratum_deleted(sender, instance, **kwargs):
+    """Mark errata.json and search results dirty when an erratum is deleted
+
+    A signal rather than Erratum.delete(), which queryset deletes, such as the
+    admin's, do not call.
+    """
+    DirtyBits.objects.filter(
+        slug__in=[DirtyBits.Slugs.ERRATA_JSON, DirtyBits.Slugs.ERRATA]
+    ).update(dirty_time=datetime.datetime.now(datetime.UTC))
 
 
 class Status(Name):
     class Meta:
         verbose_name_plural = "Statuses"
 
-    pass
-
 
 class ErratumType(Name):
     pass
 
 
+# allow direct UTF-8 in addresses
+ADDRESS_LIST_POLICY = EmailPolicy(utf8=True)
+
+
+@lru_cache(maxsize=4096)
+def _parse_address_list(value: str) -> tuple[str, ...]:
+    """Parse an address list header value, caching the result by raw string
+
+    The same author and AD lists are read over and over again, so this saves
+    re-running the RFC 5322 parser for every row that is loaded.
+    """
+    header = ADDRESS_LIST_POLICY.header_factory("To", value)
+    if len(header.defects) > 0:
+        raise ValidationError("; ".join(str(defect) for defect in header.defects))
+    return tuple(str(addr) for addr in header.addresses)
+
+
 class AddressListField(models.CharField):
     def from_db_value(self, value, expression, connection):
         return self._parse_header_value(value)
@@ -175,11 +291,50 @@ class AddressListField(models.CharField):
 
     @staticmethod
     def _parse_header_value(value: str):
-        policy = EmailPolicy(utf8=True)  # allow direct UTF-8 in addresses
-        header = policy.header_factory("To", value)
-        if len(header.defects) > 0:
-            raise ValidationError("; ".join(str(defect) for defect in header.defects))
-        return [str(addr) for addr in header.addresses]
+        # a fresh list each time, since callers may modify it
+        return list(_parse_address_list(value))
+
+
+# Closed IETF areas, and the areas that took over their RFCs
+MERGED_AREAS = {"app": "art", "rai": "art"}
+
+# Streams whose errata are the responsibility of the stream, not of an area
+STREAM_AUTHORITIES = ["iab", "ise", "irtf", "editorial", "legacy"]
+
+# The RfcMetadata fields that RfcMetadata.display_source is computed from
+DISPLAY_SOURCE_FIELDS = frozenset(["stream", "group_acronym", "area_acronym"])
+
+
+def rfc_display_source(stream, group_acronym, area_acronym, area_assignment=""):
+    """Return the source of an RFC as displayed, from its stream, group and area
+
+    Followed by the area assignment, if one is given. Stored on RfcMetadata
+    rather than computed on display. The data migrations that populated the
+    stored values have their own copies, so changing this needs a new one.
+    """
+    if stream == "ise":
+        result = "INDEPENDENT"
+    elif stream == "iab":
+        result = "IAB"
+    elif stream == "ietf" and (group_acronym in ["none", "gen"] or area_acronym == ""):
+        result = "IETF - NON WORKING GROUP"
+    elif group_acronym != "none":
+        result = group_acronym
+        if stream == "ietf" and area_acronym != "":
+            result += f" ({area_acronym})"
+        elif stream != "":
+            result += f" ({stream})"
+    # This is intentionally separated from the first branches on stream
+    elif stream != "":
+        if stream == "legacy":
+            result = "Legacy"
+        else:
+            result = stream.upper()
+    else:
+        result = ""
+    if area_assignment != "":
+        result += f" ({area_assignment})"
+    return result
 
 
 class RfcMetadata(models.Model):
@@ -206,40 +361,69 @@ class RfcMetadata(models.Model):
     area_assignment = models.CharField(max_length=40, blank=True)
     obsoleted_by = models.CharField(max_length=1024, blank=True)
     updated_by = models.CharField(max_length=1024, blank=True)
+    # Set by save() and the RFC metadata sync, see rfc_display_source()
+    display_source = models.CharField(max_length=255, blank=True, editable=False)
+    display_source_with_assignment = models.GeneratedField(
+        expression=Case(
+            When(area_assignment="", then=F("display_source")),
+            default=Concat(
+                "display_source", Value(" ("), "area_assignment", Value(")")
+            ),
+        ),
+        output_field=models.CharField(max_length=255),
+        db_persist=True,
+    )
+
+    # Who is responsible for the errata of the RFC: an area assignment made by
+    # the RPC, else the stream for non-IETF streams, else the (current) area
+    authority = models.GeneratedField(
+        expression=Case(
+            *[
+                When(area_assignment=area, then=Value(new_area))
+                for area, new_area in MERGED_AREAS.items()
+            ],
+            When(~Q(area_assignment=""), then=F("area_assignment")),
+            When(stream__in=STREAM_AUTHORITIES, then=F("stream")),
+            *[
+                When(area_acronym=area, then=Value(new_area))
+                for area, new_area in MERGED_AREAS.items()
+            ],
+            default=F("area_acronym"),
+        ),
+        output_field=models.CharField(max_length=40),
+        db_persist=True,
+    )
 
     def __str__(self):
         return f"RFC {self.rfc_number}: {self.title}"
 
-    def display_source(self):
-        if self.stream == "ise":
-            result = "INDEPENDENT"
-        elif self.stream == "iab":
-            result = "IAB"
-        elif self.stream == "ietf" and (
-            self.group_acronym in ["none", "gen"] or self.area_acronym == ""
+    def save(self, *args, **kwargs):
+        self.display_source = rfc_display_source(
+            self.stream, self.group_acronym, self.area_acronym
+        )
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not DISPLAY_SOURCE_FIELDS.isdisjoint(
+            update_fields
         ):
-            result = "IETF - NON WORKING GROUP"
-        elif self.group_acronym != "none":
-            result = self.group_acronym
-            if self.stream == "ietf" and self.area_acronym != "":
-                result += f" ({self.area_acronym})"
-            elif self.stream != "":
-                result += f" ({self.stream})"
-        # This is intentionally separated from the first branches on stream
-        elif self.stream != "":
-            if self.stream == "legacy":
-                result = "Legacy"
-            else:
-                result = self.stream.upper()
-        else:
-            result = ""
-        return result
+            kwargs["update_fields"] = {*update_fields, "display_source"}
+        super().save(*args, **kwargs)
+        # Errata are displayed with their RFC's metadata
+        DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA).update(
+            dirty_time=datetime.datetime.now(datetime.UTC)
+        )
 
-    def display_source_with_assignment(self):
-        result = self.display_source()
-        if self.area_assignment != "":
-            result += f" ({self.area_assignment})"
-        return result
+    class Meta:
+        indexes = [
+            # search_errata() and unverified_errata() filter errata by these
+            models.Index(
+                fields=["stream", "area_acronym", "area_assignment"],
+                name="errata_rfcmeta_stream_area_idx",
+            ),
+            models.Index(fields=["authority"], name="errata_rfcmeta_authority_idx"),
+            models.Index(fields=["group_acronym"], name="errata_rfcmeta_group_idx"),
+            # search_errata() matches display_source case-insensitively
+            models.Index(Upper("display_source"), name="errata_rfcmeta_source_idx"),
+        ]
 
 
 class StagedErratumStatus(models.TextChoices):
@@ -299,6 +483,16 @@ class StagedErratum(models.Model):
 
     class Meta:
         verbose_name_plural = "StagedErrata"
+        indexes = [
+            GinIndex(
+                OpClass(Upper("submitter_name"), name="gin_trgm_ops"),
+                name="errata_staged_submitter_trgm",
+            ),
+            GinIndex(
+                OpClass(Upper("submitter_email"), name="gin_trgm_ops"),
+                name="errata_staged_email_trgm",
+            ),
+        ]
 
 
 class MailMessage(models.Model):
@@ -347,15 +541,125 @@ class DirtyBits(models.Model):
 
     Web workers will set the "dirty_time" value for a given dirtybit slug.
     Celery workers will do work if "processed_time" < "dirty_time" and update
-    "processed_time".
+    "processed_time". Workers that publish a document may record a digest of
+    it in "processed_digest" to detect when the output has not changed.
+
+    The "rfc_metadata" slug only uses "processed_time", as the start time of
+    the last successful sync of all RFC metadata.
+
+    The "errata" slug only uses "dirty_time", as the generation of errata and
+    RFC metadata that cached search results were computed from.
     """
 
     class Slugs(models.TextChoices):
         ERRATA_JSON = "errata_json", "Errata JSON"
+        RFC_METADATA = "rfc_metadata", "RFC metadata"
+        ERRATA = "errata", "Errata"
 
     slug = models.CharField(max_length=40, blank=False, choices=Slugs, unique=True)
     dirty_time = models.DateTimeField(null=True, blank=True)
     processed_time = models.DateTimeField(null=True, blank=True)
+    processed_digest = models.CharField(max_length=64, blank=True)
 
     class Meta:
         verbose_name_plural = "dirty bits"
+
+
+class ErratumJsonFragment(models.Model):
+    """The serialized errata.json entry for a single erratum
+
+    Maintained by the celery task that publishes errata.json so that each
+    refresh only re-renders the errata that have changed since the last one.
+    A fragment is also re-rendered when the erratum's updated_at no longer
+    matches the one it was rendered from, and once it is older than
+    ERRATA_JSON_FRAGMENT_MAX_AGE, so changes that were never marked dirty do
+    not stay in errata.json for good.
+    """
+
+    erratum = models.OneToOneField(
+        "Erratum",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="json_fragment",
+    )
+    fragment = models.TextField()
+    # The erratum's updated_at when the fragment was rendered
+    rendered_from = models.DateTimeField(null=True)
+    rendered_at = models.DateTimeField(null=True)
+
+    def __str__(self):
+        return f"errata.json fragment for erratum {self.erratum_id}"
+
+
+# Sorts errata without a type after all typed ones, as NULLS LAST does
+UNTYPED_ORDER = 2**31 - 1
+
+
+class ErratumListing(models.Model):
+    """The display-ready columns of an erratum in search result listings
+
+    Denormalized from the erratum's status and type, so a page of results is
+    ordered and rendered from one row per erratum rather than joins and per-row
+    Python. Refreshed when any of those are saved. The RFC's source is not
+    copied here; search_errata() reads the generated
+    RfcMetadata.display_source_with_assignment, which follows any change to the
+    area assignment.
+    """
+
+    erratum = models.OneToOneField(
+        "Erratum",
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="listing",
+    )
+    rfc_number = models.PositiveIntegerField()
+    status_name = models.CharField(max_length=255)
+    status_order = models.PositiveIntegerField()
+    erratum_type_name = models.CharField(max_length=255, blank=True)
+    type_order = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            # the search ordering, see errata.search.SEARCH_KEYSET
+            models.Index(
+                fields=["status_order", "rfc_number", "type_order", "erratum"],
+                name="errata_listing_order_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Listing of erratum {self.erratum_id}"
+
+    @classmethod
+    def for_erratum(cls, erratum):
+        """Return the (unsaved) listing of an erratum"""
+        erratum_type = erratum.erratum_type
+        return cls(
+            erratum=erratum,
+            rfc_number=erratum.rfc_number,
+            status_name=erratum.status.name,
+            status_order=erratum.status.order,
+            erratum_type_name=erratum_type.name if erratum_type else "",
+            type_order=erratum_type.order if erratum_type else UNTYPED_ORDER,
+        )
+
+    @classmethod
+    def refresh(cls, errata):
+        """Rewrite the listings of the errata in a queryset"""
+        listings = [
+            cls.for_erratum(erratum)
+            for erratum in errata.select_related("status", "erratum_type")
+        ]
+        cls.objects.bulk_create(
+            listings,
+            update_conflicts=True,
+            unique_fields=["erratum"],
+            update_fields=[
+                "rfc_number",
+                "status_name",
+                "status_order",
+                "erratum_type_name",
+                "type_order",
+            ],
+        )
+        return len(listings)
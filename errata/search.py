@@ -1,17 +1,98 @@
 # Copyright The IETF Trust 2026, All Rights Reserved
 
-from django.db.models import Q
+import datetime
+import hashlib
+import json
+import math
+
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.core.cache import caches
+from django.db.models import Count, F, FloatField, Max, Q
+from django.db.models.functions import Cast, Upper
+from django.utils import timezone
 
 from .forms import ErrataSearchForm, StagedErrataFilterForm
-from .models import Erratum, StagedErratum, StagedErratumStatus
+from .models import (
+    MERGED_AREAS,
+    STREAM_AUTHORITIES,
+    DirtyBits,
+    Erratum,
+    StagedErratum,
+    StagedErratumStatus,
+)
+
+# Number of errata shown per page of search results
+SEARCH_PAGE_SIZE = 100
+
+# Maximum number of "did you mean" suggestions for a name search
+NAME_SUGGESTION_LIMIT = 5
+
+# Alias of the cache that holds search results, see cached_search_errata()
+SEARCH_CACHE_ALIAS = "search"
+
+# Keysets used to order and page through search results, in priority order.
+# A leading "-" sorts descending.
+# ErratumListing holds the ordering keys, with an index on SEARCH_KEYSET.
+SEARCH_KEYSET = (
+    "listing__status_order",
+    "listing__rfc_number",
+    "listing__type_order",
+    "pk",
+)
+# With a text query, errata are ranked by relevance within each status
+RANKED_SEARCH_KEYSET = (
+    "listing__status_order",
+    "-rank",
+    "listing__rfc_number",
+    "listing__type_order",
+    "pk",
+)
+
+
+def submitted_date_range(date_str):
+    """Return the [start, end) datetimes for a YYYY, YYYY-MM or YYYY-MM-DD prefix
+
+    The range is in the current time zone and can be matched against the
+    index on submitted_at, unlike the EXTRACT() of __month and __day lookups.
+    Returns None if the prefix is not a real date, e.g. "2024-02-30".
+    """
+    parts = [int(p) for p in date_str.split("-")]
+    try:
+        if len(parts) == 1:
+            start = datetime.date(parts[0], 1, 1)
+            end = datetime.date(parts[0] + 1, 1, 1)
+        elif len(parts) == 2:
+            start = datetime.date(parts[0], parts[1], 1)
+            end = (start + datetime.timedelta(days=31)).replace(day=1)
+        else:
+            start = datetime.date(*parts)
+            end = start + datetime.timedelta(days=1)
+    except (OverflowError, ValueError):
+        return None
+    tz = timezone.get_current_timezone()
+    return (
+        datetime.datetime.combine(start, datetime.time(), tzinfo=tz),
+        datetime.datetime.combine(end, datetime.time(), tzinfo=tz),
+    )
 
 
 def search_errata(form: ErrataSearchForm):
     if not (form.is_bound and form.is_valid()):
         return Erratum.objects.none()
-    errata = Erratum.objects.order_by(
-        "status__order", "rfc_number", "erratum_type__order", "pk"
-    ).prefetch_related("rfc_metadata", "status", "erratum_type")
+    # The listing has all the table presentation shows of the status and type,
+    # and the source is read from the generated column of the RFC metadata.
+    # The records presentation also shows obsoleted_by etc.
+    errata = Erratum.objects.select_related("listing").order_by(*SEARCH_KEYSET)
+    if form.cleaned_data.get("presentation") == "table":
+        errata = errata.annotate(
+            source=F("rfc_metadata__display_source_with_assignment")
+        )
+    else:
+        errata = errata.prefetch_related("rfc_metadata")
     if form.cleaned_data.get("rfc_number") is not None:
         errata = errata.filter(rfc_number=form.cleaned_data["rfc_number"])
     if form.cleaned_data.get("errata_id") is not None:
@@ -23,16 +104,27 @@ def search_errata(form: ErrataSearchForm):
         else:
             errata = errata.filter(status__slug=status)
     if form.cleaned_data.get("area") and form.cleaned_data["area"] != "any":
-        search_areas = [form.cleaned_data["area"]]
-        if form.cleaned_data.get("area") == "art":
-            search_areas = ["art", "app", "rai"]
+        area = form.cleaned_data["area"]
+        search_areas = [
+            area,
+            *(old for old, new in MERGED_AREAS.items() if new == area),
+        ]
+        # the errata of closed areas are under the area that took them over.
+        # RFCs of the non-IETF streams are under their stream, but are still
+        # found by their area unless they were assigned another.
         errata = errata.filter(
-            Q(rfc_metadata__area_assignment__in=search_areas)
+            Q(rfc_metadata__authority=MERGED_AREAS.get(area, area))
             | Q(
+                rfc_metadata__stream__in=STREAM_AUTHORITIES,
                 rfc_metadata__area_acronym__in=search_areas,
                 rfc_metadata__area_assignment="",
             )
         )
+        if area in MERGED_AREAS:
+            errata = errata.filter(
+                Q(rfc_metadata__area_assignment=area)
+                | Q(rfc_metadata__area_acronym=area, rfc_metadata__area_assignment="")
+            )
     if (
         form.cleaned_data.get("errata_type")
         and form.cleaned_data["errata_type"] != "any"
@@ -46,28 +138,176 @@ def search_errata(form: ErrataSearchForm):
         errata = errata.filter(
             submitter_name__icontains=form.cleaned_data["submitter_name"]
         )
+    if form.cleaned_data.get("verifier_name"):
+        errata = errata.filter(
+            verifier_name__icontains=form.cleaned_data["verifier_name"]
+        )
     if form.cleaned_data.get("stream") and form.cleaned_data["stream"] != "any":
         stream = form.cleaned_data["stream"].lower()
         if stream == "independent":
             stream = "ise"
         errata = errata.filter(rfc_metadata__stream=stream)
+    if form.cleaned_data.get("source"):
+        errata = errata.filter(
+            rfc_metadata__display_source__iexact=form.cleaned_data["source"]
+        )
     if form.cleaned_data.get("date") != "":
-        date_str = form.cleaned_data.get("date")
-        if len(date_str) == 4:
-            errata = errata.filter(submitted_at__year=date_str)
-        elif len(date_str) in [6, 7]:
-            year, month = map(int, date_str.split("-"))
-            errata = errata.filter(submitted_at__year=year, submitted_at__month=month)
-        else:
-            year, month, day = map(int, date_str.split("-"))
-            errata = errata.filter(
-                submitted_at__year=year,
-                submitted_at__month=month,
-                submitted_at__day=day,
+        submitted_range = submitted_date_range(form.cleaned_data.get("date"))
+        if submitted_range is None:
+            return errata.none()
+        start, end = submitted_range
+        errata = errata.filter(submitted_at__gte=start, submitted_at__lt=end)
+    if form.cleaned_data.get("text"):
+        query = SearchQuery(
+            form.cleaned_data["text"], config="english", search_type="websearch"
+        )
+        errata = (
+            errata.filter(search_vector=query)
+            .annotate(
+                # double precision, so the rank survives a trip through a cursor
+                rank=Cast(SearchRank(F("search_vector"), query), FloatField())
             )
+            .order_by(*RANKED_SEARCH_KEYSET)
+        )
     return errata
 
 
+def parse_search_cursor(cursor, length):
+    """Parse a cursor made by paginate_errata(), or return None if invalid"""
+    try:
+        values = tuple(float(v) for v in cursor.split(","))
+    except (AttributeError, ValueError):
+        return None
+    if len(values) != length or not all(math.isfinite(v) for v in values):
+        return None
+    return values
+
+
+def _keyset_value(erratum, key):
+    value = erratum
+    for attr in key.removeprefix("-").split("__"):
+        value = getattr(value, attr)
+    return value
+
+
+def paginate_errata(errata, cursor=None, page_size=None):
+    """Return one page of search_errata() results and the cursor for the next
+
+    Pages by keyset on the ordering of `errata`, rather than by offset, so
+    every page costs the same however deep into the results it is. `cursor` is
+    the value returned for the previous page, or None for the first page. The
+    returned cursor is None on the last page.
+    """
+    if page_size is None:
+        page_size = SEARCH_PAGE_SIZE
+    keyset = errata.query.order_by
+    after = parse_search_cursor(cursor, len(keyset)) if cursor else None
+    if after is not None:
+        # (k1, k2, ...) > (v1, v2, ...), expanded so each term can use an index
+        keyset_filter = Q()
+        for i, key in enumerate(keyset):
+            equal = {k.removeprefix("-"): v for k, v in zip(keyset[:i], after[:i])}
+            lookup = "lt" if key.startswith("-") else "gt"
+            keyset_filter |= Q(
+                **equal, **{f"{key.removeprefix('-')}__{lookup}": after[i]}
+            )
+        errata = errata.filter(keyset_filter)
+    page = list(errata[: page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+    page = page[:page_size]
+    next_cursor = ",".join(repr(_keyset_value(page[-1], key)) for key in keyset)
+    return page, next_cursor
+
+
+def count_errata_by_status(errata):
+    """Return the number of errata in `errata` for each status slug"""
+    return dict(
+        errata.order_by()
+        .values("status")
+        .annotate(count=Count("pk"))
+        .values_list("status", "count")
+    )
+
+
+def errata_generation():
+    """Return when errata or RFC metadata last changed, or None if unknown"""
+    return (
+        DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA)
+        .values_list("dirty_time", flat=True)
+        .first()
+    )
+
+
+def _search_cache_key(form: ErrataSearchForm, cursor, generation):
+    """Return the search cache key for a valid search form and page cursor
+
+    Equivalent searches share a key: the presentation, and criteria that do
+    not filter, e.g. a blank name or a status of "any", are left out. The
+    errata generation, bumped whenever an erratum or RFC metadata changes or
+    an erratum is deleted, is part of the key, so a change makes every cached
+    result unreachable.
+    """
+    criteria = {
+        name: value
+        for name, value in form.cleaned_data.items()
+        if name != "presentation" and value not in (None, "", "any")
+    }
+    digest = hashlib.sha256(
+        json.dumps([criteria, cursor], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    stamp = generation.isoformat() if generation is not None else "none"
+    return f"errata-search:{stamp}:{digest}"
+
+
+def cached_search_errata(form: ErrataSearchForm, cursor=None, generation=None):
+    """Return a page of search results, its next cursor and the status counts
+
+    The same as search_errata(), paginate_errata() and count_errata_by_status()
+    together, but the result is kept in the "search" cache until errata or RFC
+    metadata next change, so repeating a search costs a primary key lookup of
+    the page instead. Pass the errata_generation() as generation if it has
+    been read already.
+    """
+    if generation is None:
+        generation = errata_generation()
+    cache = caches[SEARCH_CACHE_ALIAS]
+    key = _search_cache_key(form, cursor, generation)
+    result = cache.get(key)
+    if result is None:
+        errata = search_errata(form)
+        page, next_cursor = paginate_errata(errata, cursor)
+        status_counts = count_errata_by_status(errata)
+        # only the ids of the page are kept, so entries stay small
+        cache.set(key, ([erratum.pk for erratum in page], next_cursor, status_counts))
+        return page, next_cursor, status_counts
+    page_ids, next_cursor, status_counts = result
+    position = {pk: i for i, pk in enumerate(page_ids)}
+    page = sorted(
+        search_errata(form).filter(pk__in=page_ids),
+        key=lambda erratum: position[erratum.pk],
+    )
+    return page, next_cursor, status_counts
+
+
+def suggest_names(field, name, limit=NAME_SUGGESTION_LIMIT):
+    """Return distinct values of an Erratum name field similar to `name`
+
+    For "did you mean" suggestions when a name search finds nothing. Matches
+    use the pg_trgm similarity operator, which the trigram index on
+    UPPER(field) serves, and are returned most similar first.
+    """
+    upper_name = name.upper()
+    return list(
+        Erratum.objects.alias(upper_field=Upper(field))
+        .filter(upper_field__trigram_similar=upper_name)
+        .values_list(field)
+        .annotate(similarity=Max(TrigramSimilarity(Upper(field), upper_name)))
+        .order_by("-similarity", field)
+        .values_list(field, flat=True)[:limit]
+    )
+
+
 def filter_staged_errata(form: StagedErrataFilterForm):
     """Return submitted StagedErrata narrowed by the filter form.
 
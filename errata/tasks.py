@@ -1,23 +1,44 @@
 # Copyright The IETF Trust 2025-2026, All Rights Reserved
 
 import datetime
-import io
+import gzip
 import requests
+import shutil
+import tempfile
 
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
 from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
 from django.core.files.storage import storages
 from django.db.models import F
 
 from utils.task_utils import RetryTask
 
 from .models import DirtyBits, Erratum, MailMessage
-from .utils import errata_json, update_rfc_metadata
+from .utils import (
+    errata_json_shards,
+    stale_errata_json_fragments,
+    update_errata_json_fragments,
+    update_rfc_metadata,
+    write_errata_json,
+)
 
 logger = get_task_logger(__name__)
 
+# errata.json is spooled in memory up to this size, then on disk
+ERRATA_JSON_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+
+ERRATA_JSON_NAME = "other/errata.json"
+ERRATA_JSON_GZIP_NAME = "other/errata.json.gz"
+ERRATA_JSON_SHARD_NAME = "other/errata/rfc{rfc_number}.json"
+
+# Publication dates are days, so look back a little past the last sync to be
+# sure that RFCs published on the same day are not missed
+RFC_METADATA_INCREMENTAL_OVERLAP = datetime.timedelta(days=1)
+
 
 class EmailTask(RetryTask):
     max_retries = 4 * 24 * 3  # every 15 minutes for 3 days
@@ -51,19 +72,142 @@ def send_mail_task(message_id):
     message.delete()
 
 
+def _log_rfc_metadata_counts(counts):
+    logger.info(
+        f"RFC metadata sync finished: {counts['created']} created, "
+        f"{counts['updated']} updated, {counts['unchanged']} unchanged"
+    )
+
+
 @shared_task
 def update_rfc_metadata_task(rfc_numbers=()):
     logger.info(
         f"Starting update_rfc_metadata_task for RFCs: "
         f"{rfc_numbers if rfc_numbers else 'all RFCs'}"
     )
-    update_rfc_metadata(rfc_numbers)
+    new_processed_time_start = datetime.datetime.now(datetime.UTC)
+    counts = update_rfc_metadata(rfc_numbers)
+    _log_rfc_metadata_counts(counts)
+    if not rfc_numbers:
+        # A full sync also serves as the starting point for incremental ones
+        DirtyBits.objects.filter(slug=DirtyBits.Slugs.RFC_METADATA).update(
+            processed_time=new_processed_time_start
+        )
+
+
+@shared_task
+def update_rfc_metadata_incremental_task():
+    """Periodically update RfcMetadata for recently published RFCs
+
+    Uses the `rfc_metadata` DirtyBits processed_time as the high-water mark.
+    Falls back to a full sync if no sync has been recorded yet.
+
+    N.B. This task MUST be set up to run periodically.
+    An initial period of 1h is suggested."""
+    sync_state = DirtyBits.objects.get(slug=DirtyBits.Slugs.RFC_METADATA)
+    new_processed_time_start = datetime.datetime.now(datetime.UTC)
+    if sync_state.processed_time is None:
+        logger.info("No previous RFC metadata sync recorded, syncing all RFCs")
+        counts = update_rfc_metadata()
+    else:
+        published_after = (
+            sync_state.processed_time - RFC_METADATA_INCREMENTAL_OVERLAP
+        ).date()
+        logger.info(f"Updating metadata for RFCs published after {published_after}")
+        counts = update_rfc_metadata(published_after=published_after)
+    _log_rfc_metadata_counts(counts)
+    DirtyBits.objects.filter(slug=DirtyBits.Slugs.RFC_METADATA).update(
+        processed_time=new_processed_time_start
+    )
+
+
+def _save_errata_json(red_bucket, spool):
+    """Save errata.json and a gzip-compressed copy of it to the bucket
+
+    `spool` is a binary file holding the errata.json document.
+    """
+    spool.seek(0)
+    red_bucket.save(ERRATA_JSON_NAME, File(spool))
+    spool.seek(0)
+    with tempfile.SpooledTemporaryFile(
+        max_size=ERRATA_JSON_SPOOL_MAX_SIZE
+    ) as gzip_spool:
+        # mtime=0 keeps the output identical for identical input
+        with gzip.GzipFile(fileobj=gzip_spool, mode="wb", mtime=0) as gz:
+            shutil.copyfileobj(spool, gz)
+        gzip_spool.seek(0)
+        red_bucket.save(ERRATA_JSON_GZIP_NAME, File(gzip_spool))
+
+
+def _save_errata_json_shards(red_bucket, rfc_numbers):
+    """Rewrite the per-RFC errata.json shards for the given RFCs
+
+    The shard of an RFC that no longer has any errata is removed.
+    """
+    for rfc_number, shard in errata_json_shards(rfc_numbers):
+        shard_name = ERRATA_JSON_SHARD_NAME.format(rfc_number=rfc_number)
+        if shard is not None:
+            red_bucket.save(shard_name, ContentFile(shard.encode("utf-8")))
+        elif red_bucket.exists(shard_name):
+            red_bucket.delete(shard_name)
+
+
+def _refresh_errata_json(dirty_work):
+    """Bring the errata.json fragments up to date and publish errata.json"""
+    new_processed_time_start = datetime.datetime.now(datetime.UTC)
+    if dirty_work.processed_time is None:
+        dirty_errata_histories = Erratum.history.all()
+    else:
+        dirty_errata_histories = Erratum.history.filter(
+            history_date__gt=dirty_work.processed_time
+        )
+    dirty_erratum_ids = list(
+        dirty_errata_histories.values_list("id", flat=True).distinct().order_by("id")
+    )
+    # Stale fragments, e.g. of errata changed without a new historical record,
+    # are re-rendered along with the errata changed since the last run
+    stale_errata = stale_errata_json_fragments(dirty_erratum_ids)
+    dirty_rfc_numbers = sorted(
+        {
+            *dirty_errata_histories.values_list("rfc_number", flat=True)
+            .order_by()
+            .distinct(),
+            *stale_errata.values_list("rfc_number", flat=True).order_by().distinct(),
+        }
+    )
+    # Only the changed errata are re-rendered; the rest of the document is
+    # spliced together from the fragments stored on previous runs.
+    update_errata_json_fragments(dirty_erratum_ids)
+    try:
+        red_bucket = storages["red_bucket"]
+        with tempfile.SpooledTemporaryFile(
+            max_size=ERRATA_JSON_SPOOL_MAX_SIZE
+        ) as spool:
+            digest = write_errata_json(spool)
+            if digest == dirty_work.processed_digest:
+                # e.g., a save that did not change any exported field
+                logger.info("errata.json is unchanged, skipping upload")
+            else:
+                _save_errata_json(red_bucket, spool)
+                _save_errata_json_shards(red_bucket, dirty_rfc_numbers)
+                # Intentionally not using .delay()
+                trigger_red_precompute_multiple_task(rfc_number_list=dirty_rfc_numbers)
+        DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA_JSON).update(
+            processed_time=new_processed_time_start,
+            processed_digest=digest,
+        )
+    except Exception as e:
+        # Log the error and swallow it.
+        logger.error(f"Attempt to push to red_bucket failed: {e}")
 
 
 @shared_task
 def update_errata_json_task():
     """Periodically update errata.json based on `errata_json` DirtyBits
 
+    errata.json is also refreshed when stored fragments are stale, even if
+    nothing marked it dirty.
+
     N.B. This task MUST be set up to run periodically.
     An initial period of 5m is suggested."""
     dirty_work = DirtyBits.objects.get(slug=DirtyBits.Slugs.ERRATA_JSON)
@@ -80,29 +224,10 @@ def update_errata_json_task():
             f"Refreshing errata.json: dirty_time >= processed_time: "
             f"{dirty_work.dirty_time} >= {dirty_work.processed_time}"
         )
-        new_processed_time_start = datetime.datetime.now(datetime.UTC)
-        if dirty_work.processed_time is None:
-            dirty_errata_histories = Erratum.history.all()
-        else:
-            dirty_errata_histories = Erratum.history.filter(
-                history_date__gt=dirty_work.processed_time
-            )
-        dirty_rfc_numbers = list(
-            dirty_errata_histories.values_list("rfc_number", flat=True)
-            .distinct()
-            .order_by("rfc_number")
-        )
-        try:
-            red_bucket = storages["red_bucket"]
-            red_bucket.save("other/errata.json", io.StringIO(errata_json()))
-            # Intentionally not using .delay()
-            trigger_red_precompute_multiple_task(rfc_number_list=dirty_rfc_numbers)
-            DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA_JSON).update(
-                processed_time=new_processed_time_start
-            )
-        except Exception as e:
-            # Log the error and swallow it.
-            logger.error(f"Attempt to push to red_bucket failed: {e}")
+        _refresh_errata_json(dirty_work)
+    elif stale_errata_json_fragments().exists():
+        logger.info("Refreshing errata.json: stored fragments are stale")
+        _refresh_errata_json(dirty_work)
     else:
         pass
 
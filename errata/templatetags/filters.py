@@ -32,9 +32,15 @@ def has_role(user, role_names):
     return has_role(user, role_names.split(","))
 
 
+@register.filter
+def status_count(status_slug, status_counts):
+    """Look up the number of matching errata for a status slug in a dict"""
+    return status_counts.get(status_slug, 0)
+
+
 @register.filter
 def is_classifiable_by(erratum, user):
-    return can_classify(user, erratum.id)
+    return can_classify(user, erratum)
 
 
 @register.filter
@@ -1,8 +1,12 @@
 # Copyright The IETF Trust 2025-2026, All Rights Reserved
 
 import datetime
+import json
 from unittest.mock import patch
 
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase, override_settings
 from django.urls import reverse
 
@@ -23,15 +27,32 @@ from errata.forms import (
     StagedErrataFilterForm,
 )
 from errata.models import (
+    MERGED_AREAS,
+    UNTYPED_ORDER,
     AddressListField,
+    DirtyBits,
     Erratum,
+    ErratumListing,
     ErratumType,
     MailMessage,
+    PointInTimeHistoricalRecords,
+    RfcMetadata,
     StagedErratum,
     StagedErratumStatus,
     Status,
 )
-from errata.search import filter_staged_errata, search_errata
+from errata.search import (
+    _search_cache_key,
+    cached_search_errata,
+    count_errata_by_status,
+    errata_generation,
+    filter_staged_errata,
+    paginate_errata,
+    search_errata,
+    submitted_date_range,
+    suggest_names,
+)
+from errata.utils import ERRATUM_JSON_KEYS, iter_errata_json_rows
 
 
 class AddressListFieldTest(TestCase):
@@ -71,43 +92,54 @@ class AddressListFieldTest(TestCase):
         self.assertIn("a@b.com", result)
         self.assertIn("c@d.com", result)
 
+    def test_parse_returns_independent_lists(self):
+        first = AddressListField._parse_header_value("cached@example.com")
+        first.append("other@example.com")
+        second = AddressListField._parse_header_value("cached@example.com")
+        self.assertEqual(second, ["cached@example.com"])
+
+    def test_parse_invalid_raises_every_time(self):
+        for _ in range(2):
+            with self.assertRaises(ValidationError):
+                AddressListField._parse_header_value("<a@b.com")
+
 
 class RfcMetadataModelTest(TestCase):
     def test_display_source_ise(self):
         rfc = RfcMetadataFactory(stream="ise")
-        self.assertEqual(rfc.display_source(), "INDEPENDENT")
+        self.assertEqual(rfc.display_source, "INDEPENDENT")
 
     def test_display_source_iab(self):
         rfc = RfcMetadataFactory(stream="iab")
-        self.assertEqual(rfc.display_source(), "IAB")
+        self.assertEqual(rfc.display_source, "IAB")
 
     def test_display_source_ietf_group_none(self):
         rfc = RfcMetadataFactory(
             stream="ietf", group_acronym="none", area_acronym="ops"
         )
-        self.assertEqual(rfc.display_source(), "IETF - NON WORKING GROUP")
+        self.assertEqual(rfc.display_source, "IETF - NON WORKING GROUP")
 
     def test_display_source_ietf_group_gen(self):
         rfc = RfcMetadataFactory(stream="ietf", group_acronym="gen", area_acronym="")
-        self.assertEqual(rfc.display_source(), "IETF - NON WORKING GROUP")
+        self.assertEqual(rfc.display_source, "IETF - NON WORKING GROUP")
 
     def test_display_source_ietf_wg_with_area(self):
         rfc = RfcMetadataFactory(
             stream="ietf", group_acronym="httpbis", area_acronym="art"
         )
-        self.assertEqual(rfc.display_source(), "httpbis (art)")
+        self.assertEqual(rfc.display_source, "httpbis (art)")
 
     def test_display_source_legacy(self):
         rfc = RfcMetadataFactory(stream="legacy", group_acronym="none")
-        self.assertEqual(rfc.display_source(), "Legacy")
+        self.assertEqual(rfc.display_source, "Legacy")
 
     def test_display_source_irtf(self):
         rfc = RfcMetadataFactory(stream="irtf", group_acronym="none")
-        self.assertEqual(rfc.display_source(), "IRTF")
+        self.assertEqual(rfc.display_source, "IRTF")
 
     def test_display_source_empty_stream(self):
         rfc = RfcMetadataFactory(stream="", group_acronym="none")
-        self.assertEqual(rfc.display_source(), "")
+        self.assertEqual(rfc.display_source, "")
 
     def test_display_source_with_assignment(self):
         rfc = RfcMetadataFactory(
@@ -116,7 +148,7 @@ class RfcMetadataModelTest(TestCase):
             area_acronym="art",
             area_assignment="ops",
         )
-        result = rfc.display_source_with_assignment()
+        result = rfc.display_source_with_assignment
         self.assertTrue(result.endswith("(ops)"))
 
     def test_display_source_with_assignment_empty(self):
@@ -126,7 +158,48 @@ class RfcMetadataModelTest(TestCase):
             area_acronym="art",
             area_assignment="",
         )
-        self.assertEqual(rfc.display_source_with_assignment(), rfc.display_source())
+        self.assertEqual(rfc.display_source_with_assignment, rfc.display_source)
+
+    def test_display_source_updated_with_update_fields(self):
+        rfc = RfcMetadataFactory(stream="iab")
+        rfc.stream = "ise"
+        rfc.save(update_fields=["stream"])
+        rfc.refresh_from_db()
+        self.assertEqual(rfc.display_source, "INDEPENDENT")
+
+    def test_display_source_with_assignment_follows_queryset_update(self):
+        rfc = RfcMetadataFactory(stream="iab")
+        RfcMetadata.objects.filter(pk=rfc.pk).update(area_assignment="sec")
+        rfc.refresh_from_db()
+        self.assertEqual(rfc.display_source_with_assignment, "IAB (sec)")
+
+    def test_authority(self):
+        cases = [
+            ({"stream": "ietf", "area_acronym": "ops"}, "ops"),
+            ({"stream": "ietf", "area_acronym": "app"}, "art"),
+            (
+                {"stream": "ietf", "area_acronym": "ops", "area_assignment": "sec"},
+                "sec",
+            ),
+            (
+                {"stream": "ietf", "area_acronym": "ops", "area_assignment": "rai"},
+                "art",
+            ),
+            ({"stream": "iab", "area_acronym": ""}, "iab"),
+            ({"stream": "legacy", "area_acronym": ""}, "legacy"),
+            ({"stream": "legacy", "area_acronym": "", "area_assignment": "int"}, "int"),
+        ]
+        for fields, expected in cases:
+            with self.subTest(**fields):
+                rfc = RfcMetadataFactory(**fields)
+                rfc.refresh_from_db()
+                self.assertEqual(rfc.authority, expected)
+
+    def test_authority_follows_queryset_update(self):
+        rfc = RfcMetadataFactory(stream="ietf", area_acronym="ops")
+        RfcMetadata.objects.filter(pk=rfc.pk).update(area_assignment="gen")
+        rfc.refresh_from_db()
+        self.assertEqual(rfc.authority, "gen")
 
     def test_str(self):
         rfc = RfcMetadataFactory(rfc_number=4321, title="Some Protocol")
@@ -159,6 +232,69 @@ class ErratumModelTest(TestCase):
             str(erratum), f"Erratum {erratum.id} for RFC {erratum.rfc_number}"
         )
 
+    def test_history_indexes(self):
+        for date_index, expected in [
+            (True, [("id", "history_date")]),
+            ("composite", [("history_date", "id"), ("id", "history_date")]),
+        ]:
+            with (
+                self.subTest(date_index=date_index),
+                override_settings(SIMPLE_HISTORY_DATE_INDEX=date_index),
+            ):
+                meta_fields = PointInTimeHistoricalRecords().get_meta_options(Erratum)
+                self.assertEqual(
+                    [tuple(index.fields) for index in meta_fields["indexes"]],
+                    expected,
+                )
+
+
+class ErratumListingTest(TestCase):
+    def setUp(self):
+        self.rfc = RfcMetadataFactory(
+            stream="ietf", group_acronym="wgone", area_acronym="ops"
+        )
+        self.erratum = ErratumFactory(
+            rfc_metadata=self.rfc,
+            rfc_number=self.rfc.rfc_number,
+            status=Status.objects.get(slug="verified"),
+            erratum_type=ErratumType.objects.get(slug="technical"),
+        )
+
+    def test_erratum_save_writes_listing(self):
+        listing = ErratumListing.objects.get(erratum=self.erratum)
+        self.assertEqual(listing.rfc_number, self.rfc.rfc_number)
+        self.assertEqual(listing.status_name, "Verified")
+        self.assertEqual(listing.status_order, self.erratum.status.order)
+        self.assertEqual(listing.erratum_type_name, "Technical")
+
+        self.erratum.erratum_type = None
+        self.erratum.save()
+        listing.refresh_from_db()
+        self.assertEqual(listing.erratum_type_name, "")
+        self.assertEqual(listing.type_order, UNTYPED_ORDER)
+
+    def test_search_table_source_follows_area_assignment(self):
+        form = ErrataSearchForm(
+            data={"rfc_number": self.rfc.rfc_number, "presentation": "table"}
+        )
+        self.assertEqual(search_errata(form).get().source, "wgone (ops)")
+        RfcMetadata.objects.filter(pk=self.rfc.pk).update(area_assignment="sec")
+        self.assertEqual(search_errata(form).get().source, "wgone (ops) (sec)")
+
+    def test_status_save_refreshes_name(self):
+        status = Status.objects.get(slug="verified")
+        status.name = "Confirmed"
+        status.save()
+        self.assertEqual(
+            ErratumListing.objects.get(erratum=self.erratum).status_name, "Confirmed"
+        )
+
+    def test_type_save_refreshes_name(self):
+        erratum_type = ErratumType.objects.get(slug="technical")
+        erratum_type.order = 5
+        erratum_type.save()
+        self.assertEqual(ErratumListing.objects.get(erratum=self.erratum).type_order, 5)
+
 
 class StagedErratumModelTest(TestCase):
     def test_default_formats(self):
@@ -478,6 +614,44 @@ class SearchErrataTest(TestCase):
         self.assertIn(self.erratum1, result)
         self.assertNotIn(self.erratum2, result)
 
+    def test_search_by_date_excludes_end_of_range(self):
+        ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            submitted_at=datetime.datetime(2022, 3, 16, tzinfo=datetime.UTC),
+        )
+        form = ErrataSearchForm(data={"date": "2022-03-15"})
+        self.assertEqual(list(search_errata(form)), [self.erratum1])
+
+    def test_search_by_invalid_date_returns_empty(self):
+        form = ErrataSearchForm(data={"date": "2022-02-30"})
+        self.assertEqual(search_errata(form).count(), 0)
+
+    def test_submitted_date_range(self):
+        utc = datetime.UTC
+        self.assertEqual(
+            submitted_date_range("2024"),
+            (
+                datetime.datetime(2024, 1, 1, tzinfo=utc),
+                datetime.datetime(2025, 1, 1, tzinfo=utc),
+            ),
+        )
+        self.assertEqual(
+            submitted_date_range("2024-12"),
+            (
+                datetime.datetime(2024, 12, 1, tzinfo=utc),
+                datetime.datetime(2025, 1, 1, tzinfo=utc),
+            ),
+        )
+        self.assertEqual(
+            submitted_date_range("2024-2-29"),
+            (
+                datetime.datetime(2024, 2, 29, tzinfo=utc),
+                datetime.datetime(2024, 3, 1, tzinfo=utc),
+            ),
+        )
+        self.assertIsNone(submitted_date_range("2024-13"))
+
     def test_search_by_wg_acronym(self):
         form = ErrataSearchForm(data={"wg_acronym": "wgone"})
         result = search_errata(form)
@@ -496,6 +670,19 @@ class SearchErrataTest(TestCase):
         self.assertIn(self.erratum1, result)
         self.assertNotIn(self.erratum2, result)
 
+    def test_search_by_area_includes_non_ietf_streams(self):
+        for stream, area in [("legacy", "ops"), ("irtf", "app")]:
+            with self.subTest(stream=stream):
+                rfc = RfcMetadataFactory(
+                    stream=stream, area_acronym=area, area_assignment=""
+                )
+                erratum = ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number)
+                for search_area in [area, MERGED_AREAS.get(area, area)]:
+                    form = ErrataSearchForm(data={"area": search_area})
+                    self.assertIn(erratum, search_errata(form))
+                form = ErrataSearchForm(data={"area": "sec"})
+                self.assertNotIn(erratum, search_errata(form))
+
     def test_search_by_area_art_expands_to_app_and_rai(self):
         art_rfc = RfcMetadataFactory(
             stream="ietf", area_acronym="art", area_assignment=""
@@ -539,6 +726,326 @@ class SearchErrataTest(TestCase):
         self.assertNotIn(self.erratum1, result)
         self.assertNotIn(self.erratum2, result)
 
+    def test_paginate_errata_pages_through_all_results(self):
+        for status, erratum_type in [
+            (self.reported, None),
+            (self.reported, self.editorial),
+            (self.verified, None),
+            (self.verified, self.technical),
+        ]:
+            ErratumFactory(
+                rfc_metadata=self.rfc1,
+                rfc_number=self.rfc1.rfc_number,
+                status=status,
+                erratum_type=erratum_type,
+            )
+        results = search_errata(ErrataSearchForm(data={}))
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = paginate_errata(results, cursor, page_size=2)
+            self.assertLessEqual(len(page), 2)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, list(results))
+
+    def test_paginate_errata_puts_untyped_errata_last(self):
+        untyped = ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            status=self.reported,
+            erratum_type=None,
+        )
+        results = search_errata(ErrataSearchForm(data={"status": "reported"}))
+        page, cursor = paginate_errata(results, page_size=1)
+        self.assertEqual(page, [self.erratum1])
+        page, cursor = paginate_errata(results, cursor, page_size=1)
+        self.assertEqual(page, [untyped])
+        self.assertIsNone(cursor)
+
+    def test_paginate_errata_ignores_invalid_cursor(self):
+        results = search_errata(ErrataSearchForm(data={}))
+        for cursor in ["", "junk", "1.2.3", "1.2.3.x"]:
+            page, next_cursor = paginate_errata(results, cursor)
+            self.assertEqual(page, list(results))
+            self.assertIsNone(next_cursor)
+
+    def test_search_by_text_matches_each_text_field(self):
+        for field in ["section", "orig_text", "corrected_text", "notes"]:
+            erratum = ErratumFactory(
+                rfc_metadata=self.rfc1,
+                rfc_number=self.rfc1.rfc_number,
+                **{field: "the retransmission timer"},
+            )
+            form = ErrataSearchForm(data={"text": "retransmission"})
+            self.assertEqual(list(search_errata(form)), [erratum])
+            erratum.delete()
+
+    def test_search_by_text_uses_stemming(self):
+        erratum = ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            notes="Both timers are retransmitted",
+        )
+        form = ErrataSearchForm(data={"text": "timer retransmit"})
+        self.assertEqual(list(search_errata(form)), [erratum])
+
+    def test_search_by_text_updated_on_save(self):
+        self.erratum1.notes = "a brand new observation"
+        self.erratum1.save()
+        form = ErrataSearchForm(data={"text": "observation"})
+        self.assertEqual(list(search_errata(form)), [self.erratum1])
+
+    def test_search_does_not_load_search_vector(self):
+        self.assertNotIn("search_vector", str(Erratum.objects.all().query))
+        form = ErrataSearchForm(data={"text": "observation"})
+        select = str(search_errata(form).query).split(" FROM ")[0]
+        self.assertNotIn("search_vector", select.split("ts_rank")[0])
+        self.assertNotIn("search_vector", str(self.rfc1.erratum.all().query))
+
+    def test_search_by_text_ranks_within_status(self):
+        weak = ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            status=self.reported,
+            notes="checksum once, then a great deal of unrelated text",
+        )
+        strong = ErratumFactory(
+            rfc_metadata=self.rfc2,
+            rfc_number=self.rfc2.rfc_number,
+            status=self.reported,
+            orig_text="checksum checksum",
+            notes="checksum",
+        )
+        verified = ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            status=self.verified,
+            notes="checksum",
+        )
+        form = ErrataSearchForm(data={"text": "checksum"})
+        results = search_errata(form)
+        self.assertEqual(list(results), [verified, strong, weak])
+        seen = []
+        cursor = None
+        while True:
+            page, cursor = paginate_errata(results, cursor, page_size=1)
+            seen.extend(page)
+            if cursor is None:
+                break
+        self.assertEqual(seen, [verified, strong, weak])
+        self.assertEqual(
+            count_errata_by_status(results), {"reported": 2, "verified": 1}
+        )
+
+    def test_search_by_source(self):
+        form = ErrataSearchForm(data={"source": "wgone (OPS)"})
+        self.assertEqual(list(search_errata(form)), [self.erratum1])
+        form = ErrataSearchForm(data={"source": "wgone"})
+        self.assertEqual(search_errata(form).count(), 0)
+
+    def test_search_by_verifier_name(self):
+        self.erratum2.verifier_name = "Carol Verifier"
+        self.erratum2.save()
+        form = ErrataSearchForm(data={"verifier_name": "verif"})
+        self.assertEqual(list(search_errata(form)), [self.erratum2])
+
+    def test_submitter_name_search_uses_trigram_index(self):
+        form = ErrataSearchForm(data={"submitter_name": "smith"})
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            # rules out a full scan of the primary key index instead
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            plan = search_errata(form).explain()
+        self.assertIn("errata_erratum_submitter_trgm", plan)
+
+    def test_suggest_names_orders_by_similarity(self):
+        ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            submitter_name="Alice Smithson",
+        )
+        self.assertEqual(
+            suggest_names("submitter_name", "alice smyth"),
+            ["Alice Smith", "Alice Smithson"],
+        )
+        self.assertEqual(suggest_names("submitter_name", "zzzz"), [])
+
+    def test_count_errata_by_status(self):
+        ErratumFactory(
+            rfc_metadata=self.rfc1,
+            rfc_number=self.rfc1.rfc_number,
+            status=self.reported,
+        )
+        results = search_errata(ErrataSearchForm(data={}))
+        self.assertEqual(
+            count_errata_by_status(results), {"reported": 2, "verified": 1}
+        )
+
+
+class SearchIndexTest(TestCase):
+    """The planner can answer the canonical searches from the indexes"""
+
+    def setUp(self):
+        self.rfc = RfcMetadataFactory(stream="ietf", area_acronym="ops")
+        ErratumFactory(rfc_metadata=self.rfc, rfc_number=self.rfc.rfc_number)
+        # enough variety that the statistics favour the selective indexes
+        statuses = list(Status.objects.all())
+        types = list(ErratumType.objects.all())
+        for n, (stream, area) in enumerate(
+            [("ietf", "sec"), ("iab", ""), ("irtf", ""), ("ise", ""), ("ietf", "art")]
+        ):
+            rfc = RfcMetadataFactory(
+                stream=stream, area_acronym=area, group_acronym=f"wg{n}"
+            )
+            for i in range(8):
+                ErratumFactory(
+                    rfc_metadata=rfc,
+                    rfc_number=rfc.rfc_number,
+                    status=statuses[i % len(statuses)],
+                    erratum_type=types[i % len(types)],
+                )
+
+    def _plan(self, data):
+        with connection.cursor() as cursor:
+            # the test tables are tiny; make the planner show what it could do.
+            # Without plain index scans, it cannot fall back to a full scan of
+            # a primary key index either.
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_indexscan = off")
+            # statistics left behind by other tests would change the plan
+            cursor.execute(
+                "ANALYZE errata_erratum, errata_erratumlisting, errata_rfcmetadata"
+            )
+            return search_errata(ErrataSearchForm(data=data)).explain()
+
+    def test_status(self):
+        plan = self._plan({"status": "verified"})
+        self.assertIn("errata_erratum_status_rfc_idx", plan)
+
+    def test_rfc_number(self):
+        plan = self._plan({"rfc_number": self.rfc.rfc_number})
+        self.assertIn("errata_erratum_rfc_status_idx", plan)
+
+    def test_errata_type(self):
+        plan = self._plan({"errata_type": "editorial"})
+        self.assertIn("errata_erratum_type_idx", plan)
+
+    def test_date(self):
+        for date in ["2024", "2024-06", "2024-06-15"]:
+            plan = self._plan({"date": date})
+            self.assertIn("errata_erratum_submitted_idx", plan)
+            self.assertNotIn("EXTRACT", plan)
+
+    def test_stream(self):
+        plan = self._plan({"stream": "IAB"})
+        self.assertIn("errata_rfcmeta_stream_area_idx", plan)
+
+    def test_area(self):
+        plan = self._plan({"area": "ops"})
+        self.assertRegex(plan, "errata_rfcmeta_authority_idx")
+        self.assertNotIn("Seq Scan", plan)
+
+    def test_source(self):
+        plan = self._plan({"source": "IAB"})
+        self.assertIn("errata_rfcmeta_source_idx", plan)
+
+    def test_wg_acronym(self):
+        plan = self._plan({"wg_acronym": "wgone"})
+        self.assertIn("errata_rfcmeta_group_idx", plan)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"},
+        "search": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class SearchCacheTest(TestCase):
+    def setUp(self):
+        caches["search"].clear()
+        DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA).update(
+            dirty_time=datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
+        )
+        self.rfc = RfcMetadataFactory(stream="iab")
+        self.erratum = ErratumFactory(
+            rfc_metadata=self.rfc,
+            rfc_number=self.rfc.rfc_number,
+            submitter_name="Alice Smith",
+        )
+
+    def _search(self, data, cursor=None):
+        form = ErrataSearchForm(data=data)
+        self.assertTrue(form.is_valid())
+        return cached_search_errata(form, cursor)
+
+    def test_repeated_search_served_from_cache(self):
+        page, next_cursor, status_counts = self._search({"stream": "IAB"})
+        self.assertEqual(page, [self.erratum])
+        self.assertIsNone(next_cursor)
+        # the errata generation, and the page by id with its RFC metadata
+        with self.assertNumQueries(3):
+            cached = self._search({"stream": "IAB"})
+        self.assertEqual(cached, (page, next_cursor, status_counts))
+
+    def test_entry_holds_the_ids_of_the_page(self):
+        second = ErratumFactory(rfc_metadata=self.rfc, rfc_number=self.rfc.rfc_number)
+        page, _, _ = self._search({"stream": "IAB"})
+        self.assertEqual(page, [self.erratum, second])
+        form = ErrataSearchForm(data={"stream": "IAB"})
+        self.assertTrue(form.is_valid())
+        key = _search_cache_key(form, None, errata_generation())
+        self.assertEqual(
+            caches["search"].get(key),
+            ([self.erratum.pk, second.pk], None, {"reported": 2}),
+        )
+        self.assertEqual(self._search({"stream": "IAB"})[0], page)
+
+    def test_equivalent_searches_share_an_entry(self):
+        self._search({"stream": "IAB", "presentation": "table"})
+        with self.assertNumQueries(3):
+            page, _, _ = self._search(
+                {"stream": "IAB", "status": "any", "submitter_name": ""}
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(page[0].rfc_metadata, self.rfc)
+
+    def test_cursor_is_part_of_key(self):
+        self._search({"stream": "IAB"})
+        with self.assertNumQueries(3):
+            page, _, _ = self._search({"stream": "IAB"}, cursor="1000,0,0,0")
+        self.assertEqual(page, [])
+
+    def test_erratum_save_invalidates(self):
+        self._search({"submitter_name": "alice"})
+        self.erratum.submitter_name = "Carol Jones"
+        self.erratum.save()
+        page, _, status_counts = self._search({"submitter_name": "alice"})
+        self.assertEqual(page, [])
+        self.assertEqual(status_counts, {})
+
+    def test_erratum_delete_invalidates(self):
+        self._search({"stream": "IAB"})
+        DirtyBits.objects.update(
+            dirty_time=datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
+        )
+        self.erratum.delete()
+        page, _, status_counts = self._search({"stream": "IAB"})
+        self.assertEqual(page, [])
+        self.assertEqual(status_counts, {})
+        self.assertGreater(
+            DirtyBits.objects.get(slug=DirtyBits.Slugs.ERRATA_JSON).dirty_time,
+            datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC),
+        )
+
+    def test_rfc_metadata_save_invalidates(self):
+        self._search({"stream": "IAB"})
+        self.rfc.stream = "irtf"
+        self.rfc.save()
+        page, _, _ = self._search({"stream": "IAB"})
+        self.assertEqual(page, [])
+
 
 class PublicViewTest(TestCase):
     def setUp(self):
@@ -562,6 +1069,120 @@ class PublicViewTest(TestCase):
         )
         self.assertEqual(response.status_code, 200)
 
+    @patch("errata.search.SEARCH_PAGE_SIZE", 1)
+    def test_search_pages_results_with_total_counts(self):
+        second = ErratumFactory(rfc_metadata=self.rfc, rfc_number=self.rfc.rfc_number)
+        response = self.client.get(
+            reverse("errata_search"), {"rfc_number": self.rfc.rfc_number}
+        )
+        self.assertEqual(list(response.context["errata"]), [self.erratum])
+        self.assertEqual(response.context["status_counts"], {"reported": 2})
+        self.assertContains(response, "Reported (2)")
+        next_url = response.context["next_url"]
+        self.assertIn("after=", next_url)
+
+        response = self.client.get(reverse("errata_search") + next_url)
+        self.assertEqual(list(response.context["errata"]), [second])
+        self.assertIsNone(response.context["next_url"])
+        self.assertEqual(
+            response.context["first_url"], f"?rfc_number={self.rfc.rfc_number}"
+        )
+        self.assertContains(response, "First page")
+
+    def test_public_pages_answer_conditional_get(self):
+        for url, queries in [
+            (reverse("errata_search") + f"?rfc_number={self.rfc.rfc_number}", 1),
+            # the erratum is checked to exist
+            (reverse("errata_detail", kwargs={"pk": self.erratum.pk}), 2),
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn("Last-Modified", response)
+            with self.assertNumQueries(queries):
+                response = self.client.get(
+                    url, headers={"if-none-match": response["ETag"]}
+                )
+            self.assertEqual(response.status_code, 304)
+
+    def test_public_page_revalidates_after_change(self):
+        url = reverse("errata_detail", kwargs={"pk": self.erratum.pk})
+        etag = self.client.get(url)["ETag"]
+        self.erratum.notes = "Changed"
+        self.erratum.save()
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Changed")
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_public_pages_must_be_revalidated(self):
+        for url in [
+            reverse("errata_search") + f"?rfc_number={self.rfc.rfc_number}",
+            reverse("errata_detail", kwargs={"pk": self.erratum.pk}),
+        ]:
+            response = self.client.get(url)
+            self.assertEqual(response["Cache-Control"], "no-cache")
+            response = self.client.get(url, headers={"if-none-match": response["ETag"]})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response["Cache-Control"], "no-cache")
+
+    def test_public_page_revalidates_after_release(self):
+        url = reverse("errata_detail", kwargs={"pk": self.erratum.pk})
+        with self.settings(ERRATA_RELEASE="1.0.0"):
+            etag = self.client.get(url)["ETag"]
+            self.assertIn("1.0.0", etag)
+        with self.settings(ERRATA_RELEASE="1.0.1"):
+            response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_missing_erratum_is_not_conditional(self):
+        url = reverse("errata_detail", kwargs={"pk": self.erratum.pk})
+        etag = self.client.get(url)["ETag"]
+        url = reverse("errata_detail", kwargs={"pk": self.erratum.pk + 1000})
+        response = self.client.get(url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
+
+    def test_public_page_not_conditional_when_signed_in(self):
+        self.client.force_login(UserFactory())
+        response = self.client.get(
+            reverse("errata_detail", kwargs={"pk": self.erratum.pk})
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+    def test_search_table_reads_listings_in_constant_queries(self):
+        for _ in range(3):
+            ErratumFactory(rfc_metadata=self.rfc, rfc_number=self.rfc.rfc_number)
+        # errata generation, for the conditional GET and the cache key; page;
+        # status counts
+        with self.assertNumQueries(3):
+            response = self.client.get(
+                reverse("errata_search"),
+                {"rfc_number": self.rfc.rfc_number, "presentation": "table"},
+            )
+        self.assertContains(response, self.rfc.display_source_with_assignment)
+        self.assertContains(response, "Reported (4)")
+
+    def test_search_suggests_similar_submitter_names(self):
+        self.erratum.submitter_name = "Jonathan Example"
+        self.erratum.save()
+        response = self.client.get(
+            reverse("errata_search"), {"submitter_name": "Jonathon Exampel"}
+        )
+        self.assertEqual(
+            response.context["did_you_mean"],
+            [("Jonathan Example", "?submitter_name=Jonathan+Example")],
+        )
+        self.assertContains(response, "Did you mean")
+
+    def test_search_with_results_has_no_suggestions(self):
+        response = self.client.get(
+            reverse("errata_search"), {"submitter_name": "Test Submitter"}
+        )
+        self.assertEqual(response.context["did_you_mean"], [])
+
     def test_detail_get_returns_200(self):
         response = self.client.get(
             reverse("errata_detail", kwargs={"pk": self.erratum.pk})
@@ -1288,6 +1909,92 @@ class ApiViewTest(TestCase):
         mock_task.delay.assert_called_once_with([1, 2, 3])
 
 
+class ApiSearchViewTest(TestCase):
+    def setUp(self):
+        self.url = reverse("errata_api_search")
+        self.rfc = RfcMetadataFactory(stream="iab")
+        self.errata = [
+            ErratumFactory(
+                rfc_metadata=self.rfc,
+                rfc_number=self.rfc.rfc_number,
+                erratum_type=ErratumType.objects.get(slug="technical"),
+                submitted_at=datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC),
+            )
+            for _ in range(3)
+        ]
+        other_rfc = RfcMetadataFactory(stream="irtf")
+        ErratumFactory(
+            rfc_metadata=other_rfc,
+            rfc_number=other_rfc.rfc_number,
+            submitted_at=datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC),
+        )
+
+    def _lines(self, response):
+        return b"".join(response.streaming_content).decode().splitlines()
+
+    def test_streams_ndjson(self):
+        response = self.client.get(self.url, {"stream": "IAB"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual(
+            [row["errata_id"] for row in rows], [str(e.pk) for e in self.errata]
+        )
+        self.assertEqual(list(rows[0]), list(ERRATUM_JSON_KEYS))
+        self.assertEqual(rows[0]["errata_type_code"], "Technical")
+
+    def test_field_selection(self):
+        response = self.client.get(
+            self.url, {"stream": "IAB", "fields": "errata_id, doc-id"}
+        )
+        rows = [json.loads(line) for line in self._lines(response)]
+        self.assertEqual(
+            rows[0],
+            {"errata_id": str(self.errata[0].pk), "doc-id": f"RFC{self.rfc.pk}"},
+        )
+
+    def test_json_format(self):
+        response = self.client.get(
+            self.url, {"stream": "IAB", "fields": "errata_id", "format": "json"}
+        )
+        self.assertEqual(response["Content-Type"], "application/json")
+        rows = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(rows, [{"errata_id": str(e.pk)} for e in self.errata])
+
+    def test_text_search(self):
+        self.errata[1].notes = "unique wording"
+        self.errata[1].save()
+        response = self.client.get(self.url, {"text": "wording", "fields": "errata_id"})
+        self.assertEqual(
+            self._lines(response), [json.dumps({"errata_id": str(self.errata[1].pk)})]
+        )
+
+    def test_queries_do_not_grow_with_results(self):
+        with self.assertNumQueries(3):
+            # status names, type names, errata
+            self._lines(self.client.get(self.url))
+
+    def test_unknown_field_returns_400(self):
+        response = self.client.get(self.url, {"fields": "errata_id,password"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("fields", response.json()["errors"])
+
+    def test_invalid_search_returns_400(self):
+        response = self.client.get(self.url, {"status": "bogus"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("status", response.json()["errors"])
+
+
+class ErratumJsonKeysTest(TestCase):
+    def test_keys_match_entries(self):
+        erratum = ErratumFactory(
+            submitted_at=datetime.datetime(2024, 1, 2, tzinfo=datetime.UTC)
+        )
+        [(_, row)] = iter_errata_json_rows(Erratum.objects.filter(pk=erratum.pk))
+        self.assertEqual(tuple(row), ERRATUM_JSON_KEYS)
+
+
 class UtilsTest(TestCase):
     def setUp(self):
         self.rpc_user = RpcUserFactory()
@@ -1324,6 +2031,29 @@ class UtilsTest(TestCase):
 
         self.assertFalse(can_classify(self.rpc_user, 999999))
 
+    def test_can_classify_queries_once_per_user(self):
+        from errata.utils import can_classify
+
+        verifier = UserFactory(roles=[["ad", "iesg"], ["ad", "ops"]])
+        other_rfc = RfcMetadataFactory(stream="ietf", area_acronym="sec")
+        other = ErratumFactory(rfc_metadata=other_rfc, rfc_number=other_rfc.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(can_classify(verifier, self.erratum.id))
+            self.assertFalse(can_classify(verifier, other.id))
+            self.assertTrue(can_classify(verifier, self.erratum))
+
+    def test_can_classify_erratum_without_query_for_rpc_user(self):
+        from errata.utils import can_classify
+
+        verified = ErratumFactory(
+            rfc_metadata=self.rfc,
+            rfc_number=self.rfc.rfc_number,
+            status=Status.objects.get(slug="verified"),
+        )
+        with self.assertNumQueries(0):
+            self.assertTrue(can_classify(self.rpc_user, self.erratum))
+            self.assertFalse(can_classify(self.rpc_user, verified))
+
 
 class StagedErrataFilterFormTest(TestCase):
     def test_empty_form_is_valid(self):
@@ -1376,6 +2106,14 @@ class FilterStagedErrataTest(TestCase):
             entry_status=StagedErratumStatus.INCOMPLETE,
         )
 
+    def test_submitter_filter_uses_trigram_indexes(self):
+        form = StagedErrataFilterForm(data={"submitter": "alice"})
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = filter_staged_errata(form).explain()
+        self.assertIn("errata_staged_submitter_trgm", plan)
+        self.assertIn("errata_staged_email_trgm", plan)
+
     def test_no_filter_returns_only_submitted(self):
         form = StagedErrataFilterForm({})
         result = filter_staged_errata(form)
@@ -52,6 +52,12 @@ class GetAdEmailsTest(TestCase):
         erratum = _fetch(ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number))
         self.assertEqual(get_ad_emails(erratum), ["art-ad@example.com"])
 
+    def test_non_ietf_stream_app_maps_to_art(self):
+        RfcMetadataFactory(area_acronym="art", area_ad_emails="art-ad@example.com")
+        rfc = RfcMetadataFactory(stream="irtf", area_acronym="app", area_assignment="")
+        erratum = _fetch(ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number))
+        self.assertEqual(get_ad_emails(erratum), ["art-ad@example.com"])
+
     def test_none_group_maps_to_gen(self):
         RfcMetadataFactory(area_acronym="gen", area_ad_emails="gen-ad@example.com")
         rfc = RfcMetadataFactory(
@@ -1,20 +1,32 @@
 # Copyright The IETF Trust 2026, All Rights Reserved
 
 import datetime
+import gzip
+import json
 from unittest.mock import MagicMock, patch
 
 from django.test import TestCase, override_settings
+from django.utils import timezone
 
 from errata.factories import ErratumFactory, MailMessageFactory, RfcMetadataFactory
-from errata.models import DirtyBits, MailMessage
+from errata.models import (
+    DirtyBits,
+    Erratum,
+    ErratumJsonFragment,
+    ErratumType,
+    MailMessage,
+    Status,
+)
 from errata.tasks import (
     SendEmailError,
     mail_monthly_report_task,
     send_mail_task,
     trigger_red_precompute_multiple_task,
     update_errata_json_task,
+    update_rfc_metadata_incremental_task,
     update_rfc_metadata_task,
 )
+from errata.utils import ERRATA_JSON_FRAGMENT_MAX_AGE
 
 
 class SendMailTaskTest(TestCase):
@@ -69,7 +81,7 @@ class UpdateRfcMetadataTaskTest(TestCase):
         with self.assertLogs("errata.tasks", level="INFO") as cm:
             update_rfc_metadata_task([1234, 5678])
         mock_update.assert_called_once_with([1234, 5678])
-        self.assertEqual(len(cm.output), 1)
+        self.assertEqual(len(cm.output), 2)
         self.assertIn("[1234, 5678]", cm.output[0])
 
     @patch("errata.tasks.update_rfc_metadata")
@@ -77,14 +89,93 @@ class UpdateRfcMetadataTaskTest(TestCase):
         with self.assertLogs("errata.tasks", level="INFO") as cm:
             update_rfc_metadata_task()
         mock_update.assert_called_once_with(())
-        self.assertEqual(len(cm.output), 1)
+        self.assertEqual(len(cm.output), 2)
         self.assertIn("all RFCs", cm.output[0])
 
+    @patch("errata.tasks.update_rfc_metadata")
+    def test_logs_row_counts(self, mock_update):
+        mock_update.return_value = {"created": 1, "updated": 2, "unchanged": 3}
+        with self.assertLogs("errata.tasks", level="INFO") as cm:
+            update_rfc_metadata_task()
+        self.assertIn("1 created, 2 updated, 3 unchanged", cm.output[1])
+
+    @patch("errata.tasks.update_rfc_metadata")
+    def test_full_sync_records_processed_time(self, mock_update):
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_rfc_metadata_task()
+        sync_state = DirtyBits.objects.get(slug=DirtyBits.Slugs.RFC_METADATA)
+        self.assertIsNotNone(sync_state.processed_time)
+
+    @patch("errata.tasks.update_rfc_metadata")
+    def test_partial_sync_does_not_record_processed_time(self, mock_update):
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_rfc_metadata_task([1234])
+        sync_state = DirtyBits.objects.get(slug=DirtyBits.Slugs.RFC_METADATA)
+        self.assertIsNone(sync_state.processed_time)
+
+
+class UpdateRfcMetadataIncrementalTaskTest(TestCase):
+    def _sync_state(self):
+        return DirtyBits.objects.get(slug=DirtyBits.Slugs.RFC_METADATA)
+
+    @patch("errata.tasks.update_rfc_metadata")
+    def test_first_run_syncs_all_rfcs(self, mock_update):
+        with self.assertLogs("errata.tasks", level="INFO") as cm:
+            update_rfc_metadata_incremental_task()
+        mock_update.assert_called_once_with()
+        self.assertIn("syncing all RFCs", cm.output[0])
+        self.assertIsNotNone(self._sync_state().processed_time)
+
+    @patch("errata.tasks.update_rfc_metadata")
+    def test_syncs_rfcs_published_since_last_run(self, mock_update):
+        sync_state = self._sync_state()
+        sync_state.processed_time = datetime.datetime(
+            2024, 3, 10, 4, 0, tzinfo=datetime.UTC
+        )
+        sync_state.save()
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_rfc_metadata_incremental_task()
+        mock_update.assert_called_once_with(published_after=datetime.date(2024, 3, 9))
+        self.assertGreater(self._sync_state().processed_time, sync_state.processed_time)
+
+    @patch("errata.tasks.update_rfc_metadata")
+    def test_failed_sync_keeps_high_water_mark(self, mock_update):
+        mock_update.side_effect = ConnectionError("datatracker unavailable")
+        sync_state = self._sync_state()
+        sync_state.processed_time = datetime.datetime(2024, 3, 10, tzinfo=datetime.UTC)
+        sync_state.save()
+        with (
+            self.assertLogs("errata.tasks", level="INFO"),
+            self.assertRaises(ConnectionError),
+        ):
+            update_rfc_metadata_incremental_task()
+        self.assertEqual(self._sync_state().processed_time, sync_state.processed_time)
+
 
 class UpdateErrataJsonTaskTest(TestCase):
     def _dirty_bits(self):
         return DirtyBits.objects.get(slug=DirtyBits.Slugs.ERRATA_JSON)
 
+    def _capture_saved(self, name, content):
+        # The uploaded file is closed once the task is done with it
+        self.saved[name] = content.read()
+        return name
+
+    def _mock_first_run(self, mock_storages):
+        """Mark errata.json dirty and never processed, and mock the bucket
+
+        Returns the mock bucket; what is uploaded to it is kept in self.saved.
+        """
+        dirty = self._dirty_bits()
+        dirty.dirty_time = datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
+        dirty.processed_time = None
+        dirty.save()
+        self.saved = {}
+        mock_bucket = MagicMock()
+        mock_bucket.save.side_effect = self._capture_saved
+        mock_storages.__getitem__.return_value = mock_bucket
+        return mock_bucket
+
     def test_null_dirty_time_skips_update(self):
         with self.assertLogs("errata.tasks", level="ERROR") as cm:
             update_errata_json_task()
@@ -107,8 +198,10 @@ class UpdateErrataJsonTaskTest(TestCase):
         with self.assertLogs("errata.tasks", level="INFO") as cm:
             update_errata_json_task()
 
-        mock_bucket.save.assert_called_once()
-        self.assertEqual(mock_bucket.save.call_args[0][0], "other/errata.json")
+        self.assertEqual(
+            [c[0][0] for c in mock_bucket.save.call_args_list],
+            ["other/errata.json", "other/errata.json.gz"],
+        )
         mock_trigger.assert_called_once()
         dirty.refresh_from_db()
         self.assertIsNotNone(dirty.processed_time)
@@ -118,19 +211,13 @@ class UpdateErrataJsonTaskTest(TestCase):
     @patch("errata.tasks.trigger_red_precompute_multiple_task")
     @patch("errata.tasks.storages")
     def test_updates_when_processed_time_is_none(self, mock_storages, mock_trigger):
-        dirty = self._dirty_bits()
-        dirty.dirty_time = datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
-        dirty.processed_time = None
-        dirty.save()
-        mock_bucket = MagicMock()
-        mock_storages.__getitem__.return_value = mock_bucket
+        mock_bucket = self._mock_first_run(mock_storages)
 
         with self.assertLogs("errata.tasks", level="INFO") as cm:
             update_errata_json_task()
 
-        mock_bucket.save.assert_called_once()
-        dirty.refresh_from_db()
-        self.assertIsNotNone(dirty.processed_time)
+        self.assertEqual(mock_bucket.save.call_count, 2)
+        self.assertIsNotNone(self._dirty_bits().processed_time)
         self.assertEqual(len(cm.output), 1)
         self.assertIn("Refreshing errata.json", cm.output[0])
 
@@ -153,19 +240,13 @@ class UpdateErrataJsonTaskTest(TestCase):
     def test_storage_error_does_not_update_processed_time(
         self, mock_storages, mock_trigger
     ):
-        dirty = self._dirty_bits()
-        dirty.dirty_time = datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
-        dirty.processed_time = None
-        dirty.save()
-        mock_bucket = MagicMock()
+        mock_bucket = self._mock_first_run(mock_storages)
         mock_bucket.save.side_effect = Exception("S3 unavailable")
-        mock_storages.__getitem__.return_value = mock_bucket
 
         with self.assertLogs("errata.tasks", level="INFO") as cm:
             update_errata_json_task()
 
-        dirty.refresh_from_db()
-        self.assertIsNone(dirty.processed_time)
+        self.assertIsNone(self._dirty_bits().processed_time)
         self.assertEqual(len(cm.output), 2)
         self.assertIn("Refreshing errata.json", cm.output[0])
         self.assertIn("Attempt to push to red_bucket failed", cm.output[1])
@@ -177,12 +258,7 @@ class UpdateErrataJsonTaskTest(TestCase):
         rfc = RfcMetadataFactory()
         erratum = ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number)
 
-        dirty = self._dirty_bits()
-        dirty.dirty_time = datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
-        dirty.processed_time = None
-        dirty.save()
-        mock_bucket = MagicMock()
-        mock_storages.__getitem__.return_value = mock_bucket
+        self._mock_first_run(mock_storages)
 
         with self.assertLogs("errata.tasks", level="INFO") as cm:
             update_errata_json_task()
@@ -193,6 +269,198 @@ class UpdateErrataJsonTaskTest(TestCase):
         self.assertEqual(len(cm.output), 1)
         self.assertIn("Refreshing errata.json", cm.output[0])
 
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_rerenders_errata_saved_without_new_history(
+        self, mock_storages, mock_trigger
+    ):
+        erratum = ErratumFactory(notes="before")
+        self._mock_first_run(mock_storages)
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        # As if the history row of a save committed after the last run started
+        Erratum.objects.filter(pk=erratum.pk).update(
+            notes="after", updated_at=timezone.now()
+        )
+        with self.assertLogs("errata.tasks", level="INFO") as cm:
+            update_errata_json_task()
+
+        self.assertIn("stored fragments are stale", cm.output[0])
+        rows = {r["errata_id"]: r for r in json.loads(self.saved["other/errata.json"])}
+        self.assertEqual(rows[str(erratum.id)]["notes"], "after")
+        self.assertEqual(
+            mock_trigger.call_args[1]["rfc_number_list"], [erratum.rfc_number]
+        )
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_rerenders_fragments_past_max_age(self, mock_storages, mock_trigger):
+        erratum = ErratumFactory(notes="before")
+        self._mock_first_run(mock_storages)
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        # Changed behind the back of save(), the history and the dirty bits
+        Erratum.objects.filter(pk=erratum.pk).update(notes="after")
+        with self.assertNoLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+        ErratumJsonFragment.objects.update(
+            rendered_at=timezone.now() - ERRATA_JSON_FRAGMENT_MAX_AGE
+        )
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        rows = {r["errata_id"]: r for r in json.loads(self.saved["other/errata.json"])}
+        self.assertEqual(rows[str(erratum.id)]["notes"], "after")
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_uploads_utf8_encoded_document(self, mock_storages, mock_trigger):
+        erratum = ErratumFactory(notes="Größe")
+        self._mock_first_run(mock_storages)
+
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        rows = json.loads(self.saved["other/errata.json"].decode("utf-8"))
+        self.assertEqual(rows[0]["errata_id"], str(erratum.id))
+        self.assertEqual(rows[0]["notes"], "Größe")
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_saves_gzip_copy(self, mock_storages, mock_trigger):
+        ErratumFactory()
+        self._mock_first_run(mock_storages)
+
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        self.assertEqual(
+            gzip.decompress(self.saved["other/errata.json.gz"]),
+            self.saved["other/errata.json"],
+        )
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_rewrites_shards_for_dirty_rfcs_only(self, mock_storages, mock_trigger):
+        rfc = RfcMetadataFactory()
+        first = ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number)
+        second = ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number)
+        untouched = ErratumFactory()
+        self._mock_first_run(mock_storages)
+
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+        shard = json.loads(self.saved[f"other/errata/rfc{rfc.rfc_number}.json"])
+        self.assertEqual(
+            [r["errata_id"] for r in shard], [str(first.id), str(second.id)]
+        )
+        self.assertIn(f"other/errata/rfc{untouched.rfc_number}.json", self.saved)
+
+        self.saved = {}
+        second.notes = "changed"
+        second.save()
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+        self.assertEqual(
+            set(self.saved),
+            {
+                "other/errata.json",
+                "other/errata.json.gz",
+                f"other/errata/rfc{rfc.rfc_number}.json",
+            },
+        )
+        shard = json.loads(self.saved[f"other/errata/rfc{rfc.rfc_number}.json"])
+        self.assertEqual(shard[1]["notes"], "changed")
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_renamed_status_and_type_are_published(self, mock_storages, mock_trigger):
+        erratum = ErratumFactory(
+            status=Status.objects.get(slug="reported"),
+            erratum_type=ErratumType.objects.get(slug="technical"),
+        )
+        ErratumFactory()
+        self._mock_first_run(mock_storages)
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        self.saved = {}
+        processed_time = self._dirty_bits().processed_time
+        for name in [Status.objects.get(slug="reported"), erratum.erratum_type]:
+            name.name = f"Renamed {name.name}"
+            name.save()
+        self.assertGreaterEqual(self._dirty_bits().dirty_time, processed_time)
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+        shard_name = f"other/errata/rfc{erratum.rfc_number}.json"
+        self.assertIn(shard_name, self.saved)
+        for document in [self.saved["other/errata.json"], self.saved[shard_name]]:
+            entry = next(
+                e for e in json.loads(document) if e["errata_id"] == str(erratum.id)
+            )
+            self.assertEqual(entry["errata_status_code"], "Renamed Reported")
+            self.assertEqual(entry["errata_type_code"], "Renamed Technical")
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_removes_shard_of_rfc_without_errata(self, mock_storages, mock_trigger):
+        erratum = ErratumFactory()
+        rfc_number = erratum.rfc_number
+        mock_bucket = self._mock_first_run(mock_storages)
+        mock_bucket.exists.return_value = True
+        erratum.delete()
+
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        mock_bucket.delete.assert_called_once_with(f"other/errata/rfc{rfc_number}.json")
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_unchanged_document_is_not_uploaded(self, mock_storages, mock_trigger):
+        erratum = ErratumFactory()
+        mock_bucket = self._mock_first_run(mock_storages)
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+        digest = self._dirty_bits().processed_digest
+        self.assertEqual(len(digest), 64)
+        mock_bucket.reset_mock()
+        mock_trigger.reset_mock()
+
+        # submitter_email is not exported, and updated_at is kept as is
+        erratum.submitter_email = "someone-else@example.com"
+        erratum._take_given_updated_at_value = True
+        erratum.save()
+        with self.assertLogs("errata.tasks", level="INFO") as cm:
+            update_errata_json_task()
+
+        mock_bucket.save.assert_not_called()
+        mock_trigger.assert_not_called()
+        dirty = self._dirty_bits()
+        self.assertGreater(dirty.processed_time, dirty.dirty_time)
+        self.assertEqual(dirty.processed_digest, digest)
+        self.assertEqual(len(cm.output), 2)
+        self.assertIn("errata.json is unchanged", cm.output[1])
+
+    @patch("errata.tasks.trigger_red_precompute_multiple_task")
+    @patch("errata.tasks.storages")
+    def test_changed_document_updates_digest(self, mock_storages, mock_trigger):
+        erratum = ErratumFactory()
+        self._mock_first_run(mock_storages)
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+        digest = self._dirty_bits().processed_digest
+
+        erratum.notes = "A new note"
+        erratum.save()
+        with self.assertLogs("errata.tasks", level="INFO"):
+            update_errata_json_task()
+
+        self.assertNotEqual(self._dirty_bits().processed_digest, digest)
+        self.assertEqual(mock_trigger.call_count, 2)
+
 
 class MailMonthlyReportTaskTest(TestCase):
     @patch("errata.tasks.send_mail_task")
@@ -14,6 +14,7 @@ from errata.templatetags.filters import (
     has_role as has_role_filter,
     is_classifiable_by,
     month_name,
+    status_count,
     suppress_strings_starting_with_99,
     txt_errata_section,
     txt_errata_verifying_party,
@@ -48,6 +49,14 @@ class MonthNameTest(TestCase):
         self.assertEqual(month_name(12), "December")
 
 
+class StatusCountTest(TestCase):
+    def test_returns_count_for_status_slug(self):
+        self.assertEqual(status_count("verified", {"verified": 7, "reported": 2}), 7)
+
+    def test_missing_status_returns_zero(self):
+        self.assertEqual(status_count("rejected", {"verified": 7}), 0)
+
+
 class HasRoleFilterTest(TestCase):
     def test_none_user_returns_false(self):
         self.assertFalse(has_role_filter(None, "rpc"))
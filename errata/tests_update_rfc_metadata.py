@@ -3,7 +3,9 @@
 from datetime import date
 from unittest.mock import MagicMock
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from rpcapi_client.models import (
     Area,
@@ -11,6 +13,7 @@ from rpcapi_client.models import (
     Group,
     PaginatedRfcMetadataList,
     RelatedDraft,
+    RelatedRfc,
     ReverseRelatedRfc,
     RfcAuthor,
     RfcMetadata as ApiRfcMetadata,
@@ -46,6 +49,8 @@ def _make_rfc(
     group_list_email="",
     obsoleted_by=None,
     updated_by=None,
+    obsoletes=None,
+    updates=None,
 ):
     return ApiRfcMetadata(
         number=number,
@@ -61,6 +66,8 @@ def _make_rfc(
         draft=draft,
         obsoleted_by=obsoleted_by if obsoleted_by is not None else [],
         updated_by=updated_by if updated_by is not None else [],
+        obsoletes=obsoletes if obsoletes is not None else [],
+        updates=updates if updates is not None else [],
     )
 
 
@@ -77,13 +84,13 @@ def _make_page(results, *, count=None):
 
 
 class UpdateRfcMetadataTest(TestCase):
-    def _run(self, page_or_pages, rfc_numbers=()):
+    def _run(self, page_or_pages, rfc_numbers=(), **kwargs):
         mock_rpcapi = MagicMock()
         if isinstance(page_or_pages, list):
             mock_rpcapi.red_doc_list.side_effect = page_or_pages
         else:
             mock_rpcapi.red_doc_list.return_value = page_or_pages
-        update_rfc_metadata(rfc_numbers=rfc_numbers, rpcapi=mock_rpcapi)
+        update_rfc_metadata(rfc_numbers=rfc_numbers, rpcapi=mock_rpcapi, **kwargs)
         return mock_rpcapi
 
     # --- record creation / update ---
@@ -104,6 +111,81 @@ class UpdateRfcMetadataTest(TestCase):
         self._run(_make_page([_make_rfc(1234, title="New Title")]))
         self.assertEqual(RfcMetadata.objects.get(rfc_number=1234).title, "New Title")
 
+    def test_update_preserves_area_assignment(self):
+        RfcMetadataFactory(rfc_number=1234, area_assignment="sec")
+        self._run(_make_page([_make_rfc(1234, title="New Title")]))
+        rfc = RfcMetadata.objects.get(rfc_number=1234)
+        self.assertEqual(rfc.title, "New Title")
+        self.assertEqual(rfc.area_assignment, "sec")
+
+    def test_display_source_stored(self):
+        RfcMetadataFactory(rfc_number=1234, stream="iab", area_assignment="sec")
+        self._run(_make_page([_make_rfc(1234), _make_rfc(1235, stream_slug="iab")]))
+        rfc = RfcMetadata.objects.get(rfc_number=1234)
+        self.assertEqual(rfc.display_source, "IETF - NON WORKING GROUP")
+        self.assertEqual(
+            rfc.display_source_with_assignment, "IETF - NON WORKING GROUP (sec)"
+        )
+        self.assertEqual(RfcMetadata.objects.get(rfc_number=1235).display_source, "IAB")
+
+    def test_page_upserted_in_constant_queries(self):
+        RfcMetadataFactory(rfc_number=1000, title="Old Title")
+        page = _make_page([_make_rfc(n) for n in range(1000, 1020)])
+        with CaptureQueriesContext(connection) as ctx:
+            self._run(page)
+        # SELECT of the stored rows, savepoint, INSERT ... ON CONFLICT, errata
+        # generation bump, release
+        self.assertEqual(len(ctx.captured_queries), 5)
+        self.assertEqual(RfcMetadata.objects.count(), 20)
+        self.assertEqual(RfcMetadata.objects.get(rfc_number=1000).title, "Test RFC")
+
+    def test_returns_row_counts(self):
+        RfcMetadataFactory(rfc_number=1000, title="Old Title")
+        self._run(_make_page([_make_rfc(1001)]))
+        mock_rpcapi = MagicMock()
+        mock_rpcapi.red_doc_list.return_value = _make_page(
+            [_make_rfc(n) for n in (1000, 1001, 1002)]
+        )
+        counts = update_rfc_metadata(rpcapi=mock_rpcapi)
+        self.assertEqual(counts, {"created": 1, "updated": 1, "unchanged": 1})
+
+    def test_unchanged_rows_not_written(self):
+        self._run(_make_page([_make_rfc(n) for n in range(1000, 1005)]))
+        with CaptureQueriesContext(connection) as ctx:
+            self._run(_make_page([_make_rfc(n) for n in range(1000, 1005)]))
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("INSERT", ctx.captured_queries[0]["sql"])
+
+    def test_unchanged_address_lists_compare_equal(self):
+        page = _make_page(
+            [
+                _make_rfc(
+                    1234,
+                    authors=[
+                        _make_author("Alice", email="alice@example.com"),
+                        _make_author("Bob", email="bob@example.com"),
+                    ],
+                    area=Area(
+                        acronym="sec",
+                        name="Security",
+                        ads=[AreaDirector(email="ad@example.com")],
+                    ),
+                )
+            ]
+        )
+        self._run(page)
+        mock_rpcapi = MagicMock()
+        mock_rpcapi.red_doc_list.return_value = page
+        counts = update_rfc_metadata(rpcapi=mock_rpcapi)
+        self.assertEqual(counts, {"created": 0, "updated": 0, "unchanged": 1})
+
+    def test_duplicate_rfc_in_page_written_once(self):
+        page = _make_page(
+            [_make_rfc(1234, title="First"), _make_rfc(1234, title="Second")]
+        )
+        self._run(page)
+        self.assertEqual(RfcMetadata.objects.get(rfc_number=1234).title, "Second")
+
     # --- authors ---
 
     def test_author_names_joined_with_comma(self):
@@ -310,6 +392,57 @@ class UpdateRfcMetadataTest(TestCase):
         call_kwargs = mock.red_doc_list.call_args.kwargs
         self.assertNotIn("number", call_kwargs)
 
+    def test_passes_published_after_to_api(self):
+        mock = self._run(_make_page([]), published_after=date(2024, 3, 9))
+        call_kwargs = mock.red_doc_list.call_args.kwargs
+        self.assertEqual(call_kwargs["published_after"], date(2024, 3, 9))
+
+    def test_no_published_after_by_default(self):
+        mock = self._run(_make_page([]))
+        self.assertNotIn("published_after", mock.red_doc_list.call_args.kwargs)
+
+    # --- incremental sync ---
+
+    def test_published_after_also_syncs_obsoleted_and_updated_rfcs(self):
+        new_rfc = _make_rfc(
+            9000,
+            obsoletes=[RelatedRfc(id=1, number=1234, title="Old")],
+            updates=[
+                RelatedRfc(id=2, number=5678, title="Updated"),
+                RelatedRfc(id=3, number=9001, title="Also new"),
+            ],
+        )
+        also_new = _make_rfc(9001)
+        related_page = _make_page(
+            [
+                _make_rfc(
+                    1234,
+                    obsoleted_by=[ReverseRelatedRfc(id=4, number=9000, title="New")],
+                ),
+                _make_rfc(
+                    5678, updated_by=[ReverseRelatedRfc(id=4, number=9000, title="New")]
+                ),
+            ]
+        )
+        mock = self._run(
+            [_make_page([new_rfc, also_new]), related_page],
+            published_after=date(2024, 3, 9),
+        )
+        self.assertEqual(mock.red_doc_list.call_count, 2)
+        related_kwargs = mock.red_doc_list.call_args_list[1].kwargs
+        self.assertEqual(related_kwargs["number"], [1234, 5678])
+        self.assertNotIn("published_after", related_kwargs)
+        self.assertEqual(
+            RfcMetadata.objects.get(rfc_number=1234).obsoleted_by, "RFC9000"
+        )
+        self.assertEqual(RfcMetadata.objects.get(rfc_number=5678).updated_by, "RFC9000")
+
+    def test_published_after_without_related_rfcs_makes_one_call(self):
+        mock = self._run(
+            _make_page([_make_rfc(9000)]), published_after=date(2024, 3, 9)
+        )
+        self.assertEqual(mock.red_doc_list.call_count, 1)
+
     # --- pagination ---
 
     def test_single_page_makes_one_api_call(self):
@@ -330,3 +463,49 @@ class UpdateRfcMetadataTest(TestCase):
         mock = self._run([page1, page2])
         second_call_kwargs = mock.red_doc_list.call_args_list[1].kwargs
         self.assertEqual(second_call_kwargs["offset"], 1)
+
+    # --- concurrent page fetching ---
+
+    def _run_concurrent(self, rfc_numbers_by_offset, *, count, fetch_workers=3):
+        def red_doc_list(**kwargs):
+            offset = kwargs.get("offset", 0)
+            return _make_page(
+                [_make_rfc(n) for n in rfc_numbers_by_offset[offset]], count=count
+            )
+
+        mock_rpcapi = MagicMock()
+        mock_rpcapi.red_doc_list.side_effect = red_doc_list
+        update_rfc_metadata(fetch_workers=fetch_workers, rpcapi=mock_rpcapi)
+        return mock_rpcapi
+
+    def test_concurrent_fetch_requests_remaining_offsets(self):
+        mock = self._run_concurrent(
+            {0: [1001, 1002], 2: [1003, 1004], 4: [1005]}, count=5
+        )
+        offsets = sorted(
+            c.kwargs.get("offset", 0) for c in mock.red_doc_list.call_args_list
+        )
+        self.assertEqual(offsets, [0, 2, 4])
+        self.assertEqual(
+            set(RfcMetadata.objects.values_list("rfc_number", flat=True)),
+            {1001, 1002, 1003, 1004, 1005},
+        )
+
+    def test_concurrent_fetch_single_page(self):
+        mock = self._run_concurrent({0: [1001]}, count=1)
+        self.assertEqual(mock.red_doc_list.call_count, 1)
+        self.assertTrue(RfcMetadata.objects.filter(rfc_number=1001).exists())
+
+    def test_concurrent_fetch_empty_result(self):
+        mock = self._run_concurrent({0: []}, count=0)
+        self.assertEqual(mock.red_doc_list.call_count, 1)
+        self.assertFalse(RfcMetadata.objects.exists())
+
+    @override_settings(RFC_METADATA_FETCH_WORKERS=2)
+    def test_fetch_workers_default_from_settings(self):
+        mock_rpcapi = MagicMock()
+        mock_rpcapi.red_doc_list.side_effect = lambda **kwargs: _make_page(
+            [_make_rfc(1000 + kwargs.get("offset", 0))], count=3
+        )
+        update_rfc_metadata(rpcapi=mock_rpcapi)
+        self.assertEqual(RfcMetadata.objects.count(), 3)
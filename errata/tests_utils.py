@@ -1,13 +1,45 @@
 # Copyright The IETF Trust 2026, All Rights Reserved
 
 import datetime
+import hashlib
+import io
 import json
+from unittest.mock import patch
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 
 from errata.factories import ErratumFactory, RfcMetadataFactory, UserFactory
-from errata.models import Status
-from errata.utils import counts_per_authority, errata_json, unverified_errata
+from errata.models import Erratum, ErratumJsonFragment, ErratumType, Status
+from errata.utils import (
+    ERRATA_JSON_FRAGMENT_MAX_AGE,
+    can_classify,
+    count_errata_per_authority,
+    counts_per_authority,
+    errata_as_of,
+    errata_json_shards,
+    iter_errata_json,
+    iter_errata_json_from_fragments,
+    iter_errata_json_rows,
+    stale_errata_json_fragments,
+    unverified_errata,
+    update_errata_json_fragments,
+    user_scopes,
+    write_errata_json,
+)
+
+
+def errata_json():
+    """Render errata.json from scratch, the reference for the stored fragments"""
+    rows = iter_errata_json_rows(Erratum.objects.order_by("id"))
+    return "".join(iter_errata_json(json.dumps(row) for _, row in rows))
+
+
+def errata_json_from_fragments():
+    """Return errata.json assembled from the stored per-erratum fragments"""
+    return "".join(iter_errata_json_from_fragments())
 
 
 def _verifier(**roles_kwargs):
@@ -125,6 +157,55 @@ class UnverifiedErratumVerifierTest(TestCase):
         result = unverified_errata(user)
         self.assertIn(assigned_erratum, result)
 
+    def test_own_area_still_sees_errata_assigned_elsewhere(self):
+        for fields, roles in [
+            # reassigned away from the AD's area
+            (
+                {"stream": "ietf", "area_acronym": "sec", "area_assignment": "ops"},
+                [["ad", "iesg"], ["ad", "sec"]],
+            ),
+            # the stream is the authority, but the RFC is in the AD's area
+            (
+                {"stream": "legacy", "area_acronym": "sec", "area_assignment": ""},
+                [["ad", "iesg"], ["ad", "sec"]],
+            ),
+            # assigned to an area, but still of the chair's stream
+            (
+                {"stream": "iab", "area_acronym": "", "area_assignment": "sec"},
+                [["chair", "iab"]],
+            ),
+        ]:
+            with self.subTest(**fields):
+                rfc = RfcMetadataFactory(**fields)
+                erratum = ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number)
+                self.assertTrue(can_classify(UserFactory(roles=roles), erratum))
+
+
+class UserScopesTest(TestCase):
+    def test_art_ad_scopes_include_closed_areas(self):
+        user = UserFactory(roles=[["ad", "iesg"], ["ad", "art"]])
+        self.assertEqual(
+            user_scopes(user),
+            frozenset([(None, "art"), (None, "app"), (None, "rai")]),
+        )
+
+    def test_area_ad_needs_iesg_role(self):
+        user = UserFactory(roles=[["ad", "ops"], ["chair", "iab"]])
+        self.assertEqual(user_scopes(user), frozenset([("iab", None)]))
+
+    def test_scopes_memoized_on_user(self):
+        user = UserFactory(roles=[["chair", "ise"]])
+        scopes = user_scopes(user)
+        user.roles = []
+        self.assertIs(user_scopes(user), scopes)
+
+    def test_same_scopes_give_same_sql(self):
+        roles = [["ad", "iesg"], ["ad", "sec"], ["chair", "irtf"], ["ad", "ops"]]
+        first = unverified_errata(UserFactory(roles=roles))
+        second = unverified_errata(UserFactory(roles=list(reversed(roles))))
+        self.assertEqual(str(first.query), str(second.query))
+        self.assertEqual(str(first.query).count(" IN "), 3)
+
 
 class ErrataJsonTest(TestCase):
     def test_no_errata_returns_empty_json_array(self):
@@ -191,6 +272,210 @@ class ErrataJsonTest(TestCase):
         datetime.date.fromisoformat(row["submit_date"])
 
 
+class ErrataJsonQueryCountTest(TestCase):
+    def _count_queries(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+        return len(ctx.captured_queries)
+
+    def test_errata_json_query_count_is_constant(self):
+        ErratumFactory()
+        baseline = self._count_queries(errata_json)
+        ErratumFactory.create_batch(
+            5, erratum_type=ErratumType.objects.get(slug="editorial")
+        )
+        ErratumFactory(status=Status.objects.get(slug="verified"))
+        self.assertEqual(self._count_queries(errata_json), baseline)
+
+    def test_fragment_update_query_count_is_constant(self):
+        ErratumFactory()
+        baseline = self._count_queries(update_errata_json_fragments)
+        ErratumJsonFragment.objects.all().delete()
+        ErratumFactory.create_batch(
+            5, erratum_type=ErratumType.objects.get(slug="editorial")
+        )
+        self.assertEqual(self._count_queries(update_errata_json_fragments), baseline)
+
+
+class ErrataJsonFragmentsTest(TestCase):
+    def test_no_errata_assembles_empty_json_array(self):
+        self.assertEqual(update_errata_json_fragments(), 0)
+        self.assertEqual(json.loads(errata_json_from_fragments()), [])
+
+    def test_assembled_document_matches_errata_json(self):
+        ErratumFactory(section="99Introduction")
+        ErratumFactory(notes="A note")
+        ErratumFactory(verifier_name="Verifier")
+        self.assertEqual(update_errata_json_fragments(), 3)
+        self.assertEqual(errata_json_from_fragments(), errata_json())
+
+    def test_missing_fragments_are_rendered(self):
+        first = ErratumFactory()
+        update_errata_json_fragments()
+        second = ErratumFactory()
+        self.assertEqual(update_errata_json_fragments(), 1)
+        self.assertTrue(
+            ErratumJsonFragment.objects.filter(erratum_id=second.id).exists()
+        )
+        self.assertEqual(ErratumJsonFragment.objects.count(), 2)
+        self.assertIn(str(first.id), errata_json_from_fragments())
+
+    def test_only_given_errata_are_rerendered(self):
+        changed = ErratumFactory(notes="before")
+        unchanged = ErratumFactory(notes="before")
+        update_errata_json_fragments()
+        rendered_at = ErratumJsonFragment.objects.get(erratum=unchanged).rendered_at
+        # Bypass save() so that neither erratum looks dirty on its own
+        Erratum.objects.update(notes="after")
+        self.assertEqual(update_errata_json_fragments([changed.id]), 1)
+        rows = {r["errata_id"]: r for r in json.loads(errata_json_from_fragments())}
+        self.assertEqual(rows[str(changed.id)]["notes"], "after")
+        self.assertEqual(
+            ErratumJsonFragment.objects.get(erratum=unchanged).rendered_at,
+            rendered_at,
+        )
+
+    def test_stale_fragments(self):
+        saved, aged, current = ErratumFactory.create_batch(3)
+        update_errata_json_fragments()
+        self.assertFalse(stale_errata_json_fragments().exists())
+        Erratum.objects.filter(pk=saved.pk).update(updated_at=timezone.now())
+        ErratumJsonFragment.objects.filter(erratum=aged).update(
+            rendered_at=timezone.now() - ERRATA_JSON_FRAGMENT_MAX_AGE
+        )
+        unrendered = ErratumFactory()
+        self.assertCountEqual(stale_errata_json_fragments(), [saved, aged, unrendered])
+        self.assertCountEqual(
+            stale_errata_json_fragments([current.id]),
+            [saved, aged, unrendered, current],
+        )
+        self.assertEqual(update_errata_json_fragments(), 3)
+        self.assertFalse(stale_errata_json_fragments().exists())
+
+    def test_fragment_of_erratum_without_updated_at_is_current(self):
+        erratum = ErratumFactory()
+        Erratum.objects.filter(pk=erratum.pk).update(updated_at=None)
+        update_errata_json_fragments()
+        self.assertFalse(stale_errata_json_fragments().exists())
+
+    def test_iter_errata_json_matches_json_dumps(self):
+        rows = [{"a": 1}, {"b": "two"}, {"c": None}]
+        for n in range(len(rows) + 1):
+            with self.subTest(n=n):
+                pieces = iter_errata_json(json.dumps(row) for row in rows[:n])
+                self.assertEqual("".join(pieces), json.dumps(rows[:n]))
+
+    def test_write_errata_json_streams_utf8(self):
+        ErratumFactory(notes="Größe")
+        ErratumFactory()
+        update_errata_json_fragments()
+        out = io.BytesIO()
+        digest = write_errata_json(out)
+        self.assertEqual(out.getvalue().decode("utf-8"), errata_json())
+        self.assertEqual(digest, hashlib.sha256(out.getvalue()).hexdigest())
+
+    def test_fragments_written_in_batches(self):
+        ErratumFactory.create_batch(3)
+        with patch("errata.utils.ERRATA_JSON_CHUNK_SIZE", 2):
+            self.assertEqual(update_errata_json_fragments(), 3)
+        self.assertEqual(ErratumJsonFragment.objects.count(), 3)
+
+    def test_shards_hold_errata_of_one_rfc(self):
+        rfc = RfcMetadataFactory()
+        ErratumFactory.create_batch(2, rfc_metadata=rfc, rfc_number=rfc.rfc_number)
+        other = ErratumFactory()
+        update_errata_json_fragments()
+        shards = dict(errata_json_shards([rfc.rfc_number, 99999]))
+        entries = json.loads(shards[rfc.rfc_number])
+        self.assertEqual(len(entries), 2)
+        self.assertNotIn(str(other.id), [entry["errata_id"] for entry in entries])
+        self.assertIsNone(shards[99999])
+
+    def test_shards_of_rfcs_without_errata_are_none(self):
+        first, second = RfcMetadataFactory.create_batch(2)
+        for rfc in (first, second):
+            ErratumFactory(rfc_metadata=rfc, rfc_number=rfc.rfc_number)
+        update_errata_json_fragments()
+        requested = [second.rfc_number, 0, first.rfc_number, 99999, 0]
+        shards = list(errata_json_shards(requested))
+        self.assertEqual(
+            [rfc_number for rfc_number, _ in shards],
+            sorted({*requested}),
+        )
+        self.assertEqual(
+            [shard is None for _, shard in shards],
+            [rfc_number in (0, 99999) for rfc_number in sorted({*requested})],
+        )
+
+    def test_deleted_erratum_is_dropped(self):
+        erratum = ErratumFactory()
+        update_errata_json_fragments()
+        erratum.delete()
+        self.assertEqual(json.loads(errata_json_from_fragments()), [])
+
+
+class ErrataAsOfTest(TestCase):
+    def _snapshot(self, historical_errata):
+        return sorted(historical_errata.values_list("id", "status_id"))
+
+    def test_matches_history_as_of(self):
+        verified = Status.objects.get(slug="verified")
+        gone = ErratumFactory()
+        gone.delete()
+        unchanged = ErratumFactory()
+        changed = ErratumFactory()
+        deleted = ErratumFactory()
+        deleted_pk = deleted.pk
+        then = timezone.now()
+        changed.status = verified
+        changed.save()
+        deleted.delete()
+        created = ErratumFactory()
+
+        snapshot = self._snapshot(errata_as_of(then))
+        self.assertEqual(snapshot, self._snapshot(Erratum.history.as_of(then)))
+        self.assertEqual(
+            snapshot,
+            sorted(
+                [
+                    (unchanged.pk, "reported"),
+                    (changed.pk, "reported"),
+                    (deleted_pk, deleted.status_id),
+                ]
+            ),
+        )
+        now = timezone.now()
+        self.assertEqual(
+            self._snapshot(errata_as_of(now)),
+            self._snapshot(Erratum.history.as_of(now)),
+        )
+        self.assertIn(
+            (created.pk, created.status_id), self._snapshot(errata_as_of(now))
+        )
+
+    def test_before_any_history(self):
+        ErratumFactory()
+        past = datetime.datetime(2000, 1, 1, tzinfo=datetime.UTC)
+        self.assertFalse(errata_as_of(past).exists())
+
+    def test_latest_version_uses_index(self):
+        for erratum in ErratumFactory.create_batch(10):
+            for section in range(5):
+                erratum.section = str(section)
+                erratum.save()
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+            cursor.execute("SET LOCAL enable_incremental_sort = off")
+            cursor.execute("ANALYZE errata_historicalerratum")
+            query = errata_as_of(timezone.now()).query
+            sql, params = query.sql_with_params()
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        self.assertIn("errata_erratum_pit_idx", plan)
+
+
 class CountsPerAuthorityTest(TestCase):
     def _technical_reported(self, **rfc_kwargs):
         rfc = RfcMetadataFactory(**rfc_kwargs)
@@ -310,3 +595,37 @@ class CountsPerAuthorityTest(TestCase):
         past = datetime.datetime(2000, 1, 1, tzinfo=datetime.UTC)
         result = counts_per_authority(as_of=past)
         self.assertEqual(result["iab"], 0)
+
+    def test_single_query(self):
+        self._technical_reported(stream="iab")
+        self._technical_reported(area_acronym="app", area_assignment="")
+        with self.assertNumQueries(1):
+            counts_per_authority()
+        future = datetime.datetime(2099, 1, 1, tzinfo=datetime.UTC)
+        with self.assertNumQueries(1):
+            counts_per_authority(as_of=future)
+
+    def test_count_errata_per_authority_filters(self):
+        rfc = RfcMetadataFactory(stream="ietf", area_acronym="ops")
+        for status, erratum_type in [
+            ("reported", "technical"),
+            ("verified", "technical"),
+            ("verified", "editorial"),
+        ]:
+            ErratumFactory(
+                rfc_metadata=rfc,
+                rfc_number=rfc.rfc_number,
+                erratum_type=ErratumType.objects.get(slug=erratum_type),
+                status=Status.objects.get(slug=status),
+            )
+        self.assertEqual(count_errata_per_authority()["ops"], 3)
+        self.assertEqual(count_errata_per_authority(statuses=["verified"])["ops"], 2)
+        self.assertEqual(
+            count_errata_per_authority(
+                statuses=["reported", "verified"], erratum_types=["technical"]
+            )["ops"],
+            2,
+        )
+        self.assertEqual(
+            count_errata_per_authority(erratum_types=["editorial"])["art"], 0
+        )
@@ -98,6 +98,7 @@ urlpatterns = [
         views.rpc_force_metadata_update_accepted,
         name="errata_rpc_force_metadata_update_accepted",
     ),
+    path("api/search/", views.api_search, name="errata_api_search"),
     path(
         "api/rfc_metadata_update/",
         views.api_rfc_metadata_update,
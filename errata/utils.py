@@ -1,22 +1,182 @@
 # Copyright The IETF Trust 2025-2026, All Rights Reserved
 
+import hashlib
 import json
 import datetime
 import operator
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import reduce
 # from zoneinfo import ZoneInfo # used to test emitting errata.json in pacifc time
 
-from functools import reduce
+from itertools import groupby
 
 import rpcapi_client
 from email.policy import EmailPolicy
 
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
 
 from errata_auth.utils import is_rpc, is_verifier
 
-from .models import Erratum, RfcMetadata
+from .models import (
+    MERGED_AREAS,
+    DirtyBits,
+    Erratum,
+    ErratumJsonFragment,
+    ErratumType,
+    RfcMetadata,
+    Status,
+    rfc_display_source,
+)
 from .rpcapi import with_rpcapi
 
+# RfcMetadata fields that are maintained from datatracker by
+# update_rfc_metadata(). Anything else, such as the area_assignment set by
+# the RPC, is left alone by a sync.
+RFC_METADATA_SYNC_FIELDS = [
+    "title",
+    "draft_name",
+    "author_names",
+    "author_emails",
+    "shepherd_email",
+    "doc_ad_email",
+    "area_ad_emails",
+    "std_level",
+    "publication_year",
+    "publication_month",
+    "group_acronym",
+    "group_name",
+    "group_list_email",
+    "area_acronym",
+    "stream",
+    "obsoleted_by",
+    "updated_by",
+    "display_source",
+]
+
+# Number of rows fetched per round trip when streaming errata.json
+ERRATA_JSON_CHUNK_SIZE = 500
+
+# Stored errata.json fragments are re-rendered at least this often, so a change
+# that bypassed save() is not published with stale values indefinitely
+ERRATA_JSON_FRAGMENT_MAX_AGE = datetime.timedelta(days=1)
+
+# Erratum columns read by iter_errata_json_rows()
+ERRATA_JSON_FIELDS = (
+    "id",
+    "rfc_metadata_id",
+    "status_id",
+    "erratum_type_id",
+    "section",
+    "orig_text",
+    "corrected_text",
+    "notes",
+    "submitted_at",
+    "submitter_name",
+    "verifier_name",
+    "updated_at",
+)
+
+
+# The RfcMetadata.authority values errata are counted under, in report order
+AUTHORITIES = [
+    "art",
+    "gen",
+    "int",
+    "ops",
+    "rtg",
+    "sec",
+    "wit",
+    "iab",
+    "ise",
+    "irtf",
+    "legacy",
+    "editorial",
+]
+
+# IESG area ADs can classify the errata of their area, and of the closed areas
+# it took over
+IESG_AREAS = {
+    "gen": ["gen"],
+    "wit": ["wit"],
+    "art": ["art", "app", "rai"],
+    "ops": ["ops"],
+    "rtg": ["rtg"],
+    "int": ["int"],
+    "sec": ["sec"],
+}
+
+# Stream managers can classify the errata of their stream
+STREAM_MANAGER_ROLES = {
+    ("chair", "iab"): "iab",
+    ("delegate_stream_manager", "iab"): "iab",
+    ("chair", "irtf"): "irtf",
+    ("delegate_stream_manager", "irtf"): "irtf",
+    ("chair", "rsab"): "editorial",
+    ("delegate_stream_manager", "rsab"): "editorial",
+    ("chair", "ise"): "ise",
+}
+
+
+def _build_role_scopes():
+    """Map each role tuple to the (stream, area) scopes of errata it can classify
+
+    None in a scope matches any stream or area.
+    """
+    role_scopes = {}
+    for area, areas in IESG_AREAS.items():
+        role_scopes[("ad", area)] = frozenset((None, a) for a in areas)
+    for role, stream in STREAM_MANAGER_ROLES.items():
+        role_scopes[role] = frozenset([(stream, None)])
+    return role_scopes
+
+
+ROLE_SCOPES = _build_role_scopes()
+
+# Area AD roles only grant scopes to ADs who are also on the IESG
+IESG_AD_ROLE = ("ad", "iesg")
+
+
+def user_scopes(user):
+    """Return the frozenset of (stream, area) scopes a verifier can classify
+
+    Memoized on the user object, which Django loads afresh for each request.
+    """
+    if not hasattr(user, "_errata_scopes"):
+        # This leakes knowledge of role details out of errata_auth
+        # consider pushing that back to that module through utility
+        # access.
+        user_roles = {tuple(role) for role in getattr(user, "roles", [])}
+        scopes = set()
+        for role in user_roles:
+            if role[0] == "ad" and IESG_AD_ROLE not in user_roles:
+                continue
+            scopes.update(ROLE_SCOPES.get(role, ()))
+        user._errata_scopes = frozenset(scopes)
+    return user._errata_scopes
+
+
+def scopes_q(scopes):
+    """Return a Q matching errata within any of the given scopes
+
+    A verifier can classify the errata of RFCs of their stream or area,
+    whatever the RFC's authority, as well as those their area is the authority
+    for, e.g. by assignment. At most one IN per column, with sorted values, so
+    the same scopes always give the same SQL.
+    """
+    streams = sorted({stream for stream, area in scopes if area is None})
+    areas = sorted({area for stream, area in scopes if stream is None})
+    authorities = sorted({*streams, *(MERGED_AREAS.get(area, area) for area in areas)})
+    queries_to_union = [Q(rfc_metadata__authority__in=authorities)]
+    if streams:
+        queries_to_union.append(Q(rfc_metadata__stream__in=streams))
+    if areas:
+        queries_to_union.append(Q(rfc_metadata__area_acronym__in=areas))
+    return reduce(operator.or_, queries_to_union)
+
 
 def unverified_errata(user):
     unverified = Erratum.objects.filter(status_id="reported")
@@ -24,201 +184,479 @@ def unverified_errata(user):
         return unverified
     if not is_verifier(user):
         return unverified.none()
-
-    # This leakes knowledge of role details out of errata_auth
-    # consider pushing that back to that module through utility
-    # access.
-    user_roles = getattr(user, "roles", [])
-    queries_to_union = []
-    # IETF Stream
-    if ["ad", "iesg"] in user_roles:
-        for area in ["gen", "wit", "art", "ops", "rtg", "int", "sec"]:
-            if ["ad", area] in user_roles:
-                queries_to_union.append(Q(rfc_metadata__area_acronym=area))
-                queries_to_union.append(Q(rfc_metadata__area_assignment=area))
-                if area == "art":
-                    for oldarea in ["app", "rai"]:
-                        queries_to_union.append(Q(rfc_metadata__area_acronym=oldarea))
-                        queries_to_union.append(
-                            Q(rfc_metadata__area_assignment=oldarea)
-                        )
-    # IAB
-    for role in [
-        ["chair", "iab"],
-        ["delegate_stream_manager", "iab"],
-    ]:
-        if role in user_roles:
-            queries_to_union.append(Q(rfc_metadata__stream="iab"))
-    # IRTF Stream
-    for role in [
-        ["chair", "irtf"],
-        ["delegate_stream_manager", "irtf"],
-    ]:
-        if role in user_roles:
-            queries_to_union.append(Q(rfc_metadata__stream="irtf"))
-    # Editorial Stream
-    for role in [
-        ["chair", "rsab"],
-        ["delegate_stream_manager", "rsab"],
-    ]:
-        if role in user_roles:
-            queries_to_union.append(Q(rfc_metadata__stream="editorial"))
-    # Independent Stream
-    if ["chair", "ise"] in user_roles:
-        queries_to_union.append(Q(rfc_metadata__stream="ise"))
-    if not queries_to_union:
+    scopes = user_scopes(user)
+    if not scopes:
         return unverified.none()
-    combined_queries = reduce(operator.or_, queries_to_union)
-    return unverified.filter(combined_queries)
+    return unverified.filter(scopes_q(scopes))
+
+
+class ClassifiableErrata:
+    """The errata a user can classify, for answering can_classify() in O(1)
+
+    The ids of the errata are read with one query, the first time they are
+    needed. RPC users can classify every reported erratum, so for them an
+    Erratum is checked by its status without a query.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.all_reported = is_rpc(user)
+        self._ids = None
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = frozenset(
+                unverified_errata(self.user).values_list("id", flat=True)
+            )
+        return self._ids
+
+    def __contains__(self, erratum):
+        """Check an Erratum, or an erratum id"""
+        if isinstance(erratum, Erratum):
+            if self.all_reported:
+                return erratum.status_id == "reported"
+            erratum = erratum.pk
+        return erratum in self.ids
+
+
+def classifiable_errata(user):
+    """Return the ClassifiableErrata of a user, memoized on the user object
+
+    Django loads request.user afresh for each request, so this is computed at
+    most once per request however many errata a page checks.
+    """
+    if not hasattr(user, "_classifiable_errata"):
+        user._classifiable_errata = ClassifiableErrata(user)
+    return user._classifiable_errata
+
+
+def can_classify(user, erratum):
+    """Return whether user can classify an Erratum, given it or its id"""
+    return erratum in classifiable_errata(user)
+
+
+def _rfc_metadata_fields(r, policy):
+    """Return the RfcMetadata field values for one red_doc_list result"""
+    authors = []
+    for a in r.authors:
+        name = a.titlepage_name
+        if a.is_editor:
+            name += ", Ed."
+        authors.append(name)
+    author_emails = []
+    for a in r.authors:
+        if a.email is not None:
+            header = policy.header_factory("To", a.email)
+            if len(header.defects) == 0:
+                author_emails.append(a.email)
+    area_ad_emails = []
+    if r.area and r.area.ads:
+        for ad in r.area.ads:
+            if ad.email is not None:
+                header = policy.header_factory("To", ad.email)
+                if len(header.defects) == 0:
+                    area_ad_emails.append(ad.email)
+    group_acronym = r.group.acronym
+    area_acronym = r.area.acronym if r.area else ""
+    stream = r.stream.slug
+    return dict(
+        title=r.title,
+        draft_name=r.draft.name if r.draft else "",
+        author_names=", ".join(authors),
+        author_emails=", ".join(author_emails),
+        shepherd_email=r.draft.shepherd.email
+        if r.draft and r.draft.shepherd and r.draft.shepherd.email
+        else "",
+        doc_ad_email=r.ad.email if r.ad and r.ad.email else "",
+        area_ad_emails=", ".join(area_ad_emails),
+        std_level=r.status.name.title(),
+        publication_year=r.published.year,
+        publication_month=r.published.month,
+        group_acronym=group_acronym,
+        group_name=r.group.name,
+        group_list_email=r.group_list_email,
+        area_acronym=area_acronym,
+        stream=stream,
+        obsoleted_by=", ".join(
+            [f"RFC{o.number}" for o in sorted(r.obsoleted_by, key=lambda x: x.number)]
+        ),
+        updated_by=", ".join(
+            [f"RFC{u.number}" for u in sorted(r.updated_by, key=lambda x: x.number)]
+        ),
+        # bulk_create() does not call RfcMetadata.save(), which usually sets it
+        display_source=rfc_display_source(stream, group_acronym, area_acronym),
+    )
+
+
+def _rfc_metadata_sync_values(rfc_metadata):
+    """Return the synced field values of an RfcMetadata in comparable form"""
+    return tuple(
+        RfcMetadata._meta.get_field(name).to_python(getattr(rfc_metadata, name))
+        for name in RFC_METADATA_SYNC_FIELDS
+    )
+
+
+def _save_rfc_metadata_page(results, policy):
+    """Upsert the RfcMetadata rows for one page of red_doc_list results
+
+    The stored rows for the page are loaded with one query and only the new or
+    changed ones are written, with a single INSERT ... ON CONFLICT DO UPDATE,
+    bumping the errata generation so cached search results are recomputed.
+    Returns a Counter of "created", "updated" and "unchanged" rows.
+    """
+    rows = {
+        r.number: RfcMetadata(rfc_number=r.number, **_rfc_metadata_fields(r, policy))
+        for r in results
+    }
+    existing = RfcMetadata.objects.in_bulk(rows.keys())
+    counts = Counter(created=0, updated=0, unchanged=0)
+    changed = []
+    for rfc_number, row in rows.items():
+        if rfc_number not in existing:
+            counts["created"] += 1
+        elif _rfc_metadata_sync_values(row) != _rfc_metadata_sync_values(
+            existing[rfc_number]
+        ):
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+            continue
+        changed.append(row)
+    if len(changed) > 0:
+        with transaction.atomic():
+            RfcMetadata.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=["rfc_number"],
+                update_fields=RFC_METADATA_SYNC_FIELDS,
+            )
+            DirtyBits.objects.filter(slug=DirtyBits.Slugs.ERRATA).update(
+                dirty_time=datetime.datetime.now(datetime.UTC)
+            )
+    return counts
+
+
+def _iter_rfc_metadata_pages(rpcapi, api_kwargs, fetch_workers):
+    """Yield the results of each red_doc_list page for the given query, in order
+
+    With fetch_workers > 1, the offsets of the remaining pages are computed from
+    the first response and fetched by that many threads while the caller is
+    still working through earlier pages.
+    """
+    page = rpcapi.red_doc_list(**api_kwargs)
+    if fetch_workers > 1:
+        yield page.results
+        page_size = len(page.results)
+        if page_size == 0:
+            return
 
+        def fetch_page(offset):
+            return rpcapi.red_doc_list(**api_kwargs, offset=offset)
 
-def can_classify(user, erratum_id):
-    return unverified_errata(user).filter(id=erratum_id).exists()
+        with ThreadPoolExecutor(max_workers=fetch_workers) as executor:
+            offsets = range(page_size, page.count, page_size)
+            for next_page in executor.map(fetch_page, offsets):
+                yield next_page.results
+        return
+    offset = 0
+    while offset < page.count:
+        yield page.results
+        offset += len(page.results)
+        api_kwargs["offset"] = offset
+        if offset < page.count:
+            page = rpcapi.red_doc_list(**api_kwargs)
 
 
 @with_rpcapi
-def update_rfc_metadata(rfc_numbers=(), *, rpcapi: rpcapi_client.RedApi) -> None:
+def update_rfc_metadata(
+    rfc_numbers=(),
+    *,
+    published_after=None,
+    fetch_workers=None,
+    rpcapi: rpcapi_client.RedApi,
+) -> dict:
     """Update the rfc_metadata table for a given list of rfc numbers.
 
     If no list is provided, update metadata for all RFCs.
+
+    If published_after (a date) is given, only RFCs published since then are
+    fetched, together with the RFCs they obsolete or update, whose
+    obsoleted_by / updated_by lists have changed as a result.
+
+    With fetch_workers > 1 (default: settings.RFC_METADATA_FETCH_WORKERS),
+    pages are fetched concurrently. They are still written in order, from this
+    thread.
+
+    Returns the number of RfcMetadata rows "created", "updated" and left
+    "unchanged".
     """
+    if fetch_workers is None:
+        fetch_workers = settings.RFC_METADATA_FETCH_WORKERS
     api_kwargs = dict(sort=["published"], limit=500)
     if rfc_numbers != ():
         api_kwargs["number"] = list(rfc_numbers)
+    if published_after is not None:
+        api_kwargs["published_after"] = published_after
     policy = EmailPolicy(utf8=True)
-    page = rpcapi.red_doc_list(**api_kwargs)
-    offset = 0
-    while offset < page.count:
-        for r in page.results:
-            authors = []
-            for a in r.authors:
-                name = a.titlepage_name
-                if a.is_editor:
-                    name += ", Ed."
-                authors.append(name)
-            author_emails = []
-            for a in r.authors:
-                if a.email is not None:
-                    header = policy.header_factory("To", a.email)
-                    if len(header.defects) == 0:
-                        author_emails.append(a.email)
-            area_ad_emails = []
-            if r.area and r.area.ads:
-                for ad in r.area.ads:
-                    if ad.email is not None:
-                        header = policy.header_factory("To", ad.email)
-                        if len(header.defects) == 0:
-                            area_ad_emails.append(ad.email)
-            RfcMetadata.objects.filter(rfc_number=r.number).update_or_create(
-                rfc_number=r.number,
-                defaults=dict(
-                    title=r.title,
-                    draft_name=r.draft.name if r.draft else "",
-                    author_names=", ".join(authors),
-                    author_emails=", ".join(author_emails),
-                    shepherd_email=r.draft.shepherd.email
-                    if r.draft and r.draft.shepherd and r.draft.shepherd.email
-                    else "",
-                    doc_ad_email=r.ad.email if r.ad and r.ad.email else "",
-                    area_ad_emails=", ".join(area_ad_emails),
-                    std_level=r.status.name.title(),
-                    publication_year=r.published.year,
-                    publication_month=r.published.month,
-                    group_acronym=r.group.acronym,
-                    group_name=r.group.name,
-                    group_list_email=r.group_list_email,
-                    area_acronym=r.area.acronym if r.area else "",
-                    stream=r.stream.slug,
-                    obsoleted_by=", ".join(
-                        [
-                            f"RFC{o.number}"
-                            for o in sorted(r.obsoleted_by, key=lambda x: x.number)
-                        ]
-                    ),
-                    updated_by=", ".join(
-                        [
-                            f"RFC{u.number}"
-                            for u in sorted(r.updated_by, key=lambda x: x.number)
-                        ]
-                    ),
-                ),
+    counts = Counter(created=0, updated=0, unchanged=0)
+    synced = set()
+    related = set()
+    for results in _iter_rfc_metadata_pages(rpcapi, api_kwargs, fetch_workers):
+        counts.update(_save_rfc_metadata_page(results, policy))
+        if published_after is not None:
+            for r in results:
+                synced.add(r.number)
+                related.update(o.number for o in r.obsoletes or [])
+                related.update(u.number for u in r.updates or [])
+    related -= synced
+    if related:
+        counts.update(
+            update_rfc_metadata(
+                sorted(related), fetch_workers=fetch_workers, rpcapi=rpcapi
             )
-        offset += len(page.results)
-        api_kwargs["offset"] = offset
-        if offset < page.count:
-            page = rpcapi.red_doc_list(**api_kwargs)
-    return
+        )
+    return dict(counts)
+
+
+# Keys of an errata.json entry, in order, see erratum_json_row()
+ERRATUM_JSON_KEYS = (
+    "errata_id",
+    "doc-id",
+    "errata_status_code",
+    "errata_type_code",
+    "section",
+    "orig_text",
+    "correct_text",
+    "notes",
+    "submit_date",
+    "submitter_name",
+    "verifier_id",
+    "verifier_name",
+    "update_date",
+)
+
 
+def erratum_json_row(e, status_names, type_names):
+    """Return the errata.json entry for a single erratum as a dict.
 
-def errata_json():
-    """Return a JSON object of all errata with their metadata."""
+    `e` is a row from iter_errata_json_rows(); the status and type names are
+    looked up in the given slug-to-name mappings.
+    """
     # pacific_tz = ZoneInfo("America/Los_Angeles")
+    return {
+        "errata_id": f"{e['id']}",
+        "doc-id": f"RFC{e['rfc_metadata_id']}",  # Note the hyphen in the key
+        "errata_status_code": f"{status_names[e['status_id']]}",
+        "errata_type_code": f"{type_names[e['erratum_type_id']]}",
+        "section": e["section"]
+        if not e["section"].startswith("99")
+        else e["section"][2:],
+        "orig_text": e["orig_text"],
+        "correct_text": e["corrected_text"],
+        "notes": e["notes"],
+        "submit_date": e["submitted_at"].date().isoformat(),
+        "submitter_name": e["submitter_name"],
+        "verifier_id": "",  # deprecating verifier_id
+        "verifier_name": e["verifier_name"],
+        "update_date": e["updated_at"].strftime("%Y-%m-%d %H:%M:%S")
+        if e["updated_at"] is not None
+        else None,
+        # "update_date": e["updated_at"].astimezone(pacific_tz).strftime("%Y-%m-%d %H:%M:%S"),
+    }
 
-    rows = [
-        {
-            "errata_id": f"{e.id}",
-            "doc-id": f"RFC{e.rfc_metadata.rfc_number}",  # Note the hyphen in the key
-            "errata_status_code": f"{e.status.name}",
-            "errata_type_code": f"{e.erratum_type.name}",
-            "section": e.section if not e.section.startswith("99") else e.section[2:],
-            "orig_text": e.orig_text,
-            "correct_text": e.corrected_text,
-            "notes": e.notes,
-            "submit_date": e.submitted_at.date().isoformat(),
-            "submitter_name": e.submitter_name,
-            "verifier_id": "",  # deprecating verifier_id
-            "verifier_name": e.verifier_name,
-            "update_date": e.updated_at.strftime("%Y-%m-%d %H:%M:%S")
-            if e.updated_at is not None
-            else None,
-            # "update_date": e.updated_at.astimezone(pacific_tz).strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        for e in Erratum.objects.select_related("rfc_metadata").all()
-    ]
-    return json.dumps(rows)
 
+def iter_errata_json_rows(errata):
+    """Yield (erratum columns, errata.json entry) for each erratum in a queryset.
 
-def counts_per_authority(as_of: datetime.datetime = None):
-    """Return a JSON object of counts of errata by authority as of a given date."""
+    The errata are read with a flat values() query and the status and type
+    names are looked up once up front, so the number of queries does not grow
+    with the number of errata.
+    """
+    status_names = dict(Status.objects.values_list("slug", "name"))
+    type_names = dict(ErratumType.objects.values_list("slug", "name"))
+    rows = errata.values(*ERRATA_JSON_FIELDS).iterator(
+        chunk_size=ERRATA_JSON_CHUNK_SIZE
+    )
+    for e in rows:
+        yield e, erratum_json_row(e, status_names, type_names)
+
+
+def iter_errata_json(fragments):
+    """Yield errata.json piece by piece from an iterable of serialized entries.
+
+    Joining the pieces gives the same text as json.dumps() of the entry list,
+    without ever holding the whole document in memory.
+    """
+    yield "["
+    for n, fragment in enumerate(fragments):
+        if n > 0:
+            yield ", "
+        yield fragment
+    yield "]"
+
+
+def iter_errata_json_entries(errata, keys=ERRATUM_JSON_KEYS):
+    """Yield the serialized errata.json entry of each erratum in a queryset
+
+    Only the given keys of each entry are included. The errata are read in
+    chunks, so the output can be streamed however many errata there are.
+    """
+    for _, row in iter_errata_json_rows(errata):
+        yield json.dumps({key: row[key] for key in keys})
+
+
+def stale_errata_json_fragments(erratum_ids=()):
+    """Return the errata whose stored errata.json fragment must be re-rendered.
+
+    Besides the given errata, these are the errata without a fragment, those
+    saved since their fragment was rendered, and those whose fragment is older
+    than ERRATA_JSON_FRAGMENT_MAX_AGE.
+    """
+    rendered_before = timezone.now() - ERRATA_JSON_FRAGMENT_MAX_AGE
+    return Erratum.objects.filter(
+        Q(id__in=erratum_ids)
+        # Also matches errata that have no fragment
+        | Q(json_fragment__rendered_at__isnull=True)
+        | Q(json_fragment__rendered_at__lt=rendered_before)
+        | Q(updated_at__gt=F("json_fragment__rendered_from"))
+        | Q(updated_at__lt=F("json_fragment__rendered_from"))
+    )
+
+
+def update_errata_json_fragments(erratum_ids=()):
+    """Re-render the stored errata.json fragments for the given errata.
+
+    Stale fragments, as found by stale_errata_json_fragments(), are always
+    re-rendered, so the first call renders every erratum. Returns the number of
+    fragments written.
+    """
+    stale = stale_errata_json_fragments(erratum_ids)
+    rendered_at = timezone.now()
+    written = 0
+    fragments = []
+    for e, row in iter_errata_json_rows(stale):
+        fragments.append(
+            ErratumJsonFragment(
+                erratum_id=e["id"],
+                fragment=json.dumps(row),
+                rendered_from=e["updated_at"],
+                rendered_at=rendered_at,
+            )
+        )
+        if len(fragments) == ERRATA_JSON_CHUNK_SIZE:
+            written += _save_errata_json_fragments(fragments)
+            fragments = []
+    written += _save_errata_json_fragments(fragments)
+    return written
+
+
+def _save_errata_json_fragments(fragments):
+    ErratumJsonFragment.objects.bulk_create(
+        fragments,
+        update_conflicts=True,
+        unique_fields=["erratum"],
+        update_fields=["fragment", "rendered_from", "rendered_at"],
+    )
+    return len(fragments)
+
+
+def iter_errata_json_from_fragments():
+    """Yield errata.json assembled from the stored per-erratum fragments.
+
+    The result is identical to rendering every erratum afresh when the
+    fragments are current.
+    """
+    fragments = ErratumJsonFragment.objects.order_by("erratum_id").values_list(
+        "fragment", flat=True
+    )
+    return iter_errata_json(fragments.iterator(chunk_size=ERRATA_JSON_CHUNK_SIZE))
+
+
+def errata_json_shards(rfc_numbers):
+    """Yield (rfc_number, shard) for each of the given RFCs, in RFC order.
+
+    A shard is the errata.json document restricted to the errata for one RFC,
+    assembled from the stored fragments. The shard is None for an RFC that
+    has no errata. Each shard is built as the fragments are streamed, so only
+    one is in memory at a time.
+    """
+    fragments = (
+        ErratumJsonFragment.objects.filter(erratum__rfc_number__in=rfc_numbers)
+        .order_by("erratum__rfc_number", "erratum_id")
+        .values_list("erratum__rfc_number", "fragment")
+        .iterator(chunk_size=ERRATA_JSON_CHUNK_SIZE)
+    )
+    requested = iter(sorted(set(rfc_numbers)))
+    for rfc_number, group in groupby(fragments, key=operator.itemgetter(0)):
+        # the requested RFCs before this one have no errata
+        for other in requested:
+            if other == rfc_number:
+                break
+            yield other, None
+        yield rfc_number, "".join(iter_errata_json(fragment for _, fragment in group))
+    for rfc_number in requested:
+        yield rfc_number, None
+
+
+def write_errata_json(fileobj):
+    """Stream errata.json from the stored fragments into a binary file object
+
+    Returns the SHA-256 hex digest of the bytes written.
+    """
+    digest = hashlib.sha256()
+    for piece in iter_errata_json_from_fragments():
+        data = piece.encode("utf-8")
+        digest.update(data)
+        fileobj.write(data)
+    return digest.hexdigest()
+
+
+def errata_as_of(as_of: datetime.datetime):
+    """Return the historical records of the errata as they were at as_of
+
+    Like Erratum.history.as_of(), but picks the latest version of each erratum
+    with a DISTINCT ON over the (id, history_date) index, rather than checking
+    every historical record for a later version of the same erratum.
+    """
+    latest_versions = (
+        Erratum.history.filter(history_date__lte=as_of)
+        .order_by("-id", "-history_date")
+        .distinct("id")
+        .values("history_id")
+    )
+    return Erratum.history.filter(history_id__in=latest_versions).exclude(
+        history_type="-"
+    )
+
+
+def count_errata_per_authority(statuses=None, erratum_types=None, as_of=None):
+    """Return a dict of the number of errata of each authority, in a single query
+
+    statuses and erratum_types are slugs to restrict the count to, None counting
+    errata of any status or type. With as_of, the errata are counted as they
+    were at that time.
+    """
     if as_of is None:
-        qs = Erratum.objects.filter(erratum_type_id="technical", status_id="reported")
+        errata = Erratum.objects.all()
     else:
-        qs = Erratum.history.as_of(as_of).filter(
-            erratum_type_id="technical",
-            status_id="reported",
-        )
-    results = {}
-    for authority in [
-        "art",
-        "gen",
-        "int",
-        "ops",
-        "rtg",
-        "sec",
-        "wit",
-        "iab",
-        "ise",
-        "irtf",
-        "legacy",
-        "editorial",
-    ]:
-        if authority == "art":
-            authority_q = Q(
-                rfc_metadata__area_acronym__in=["art", "app", "rai"],
-                rfc_metadata__area_assignment="",
-            ) | Q(rfc_metadata__area_assignment__in=["art", "app", "rai"])
-        elif authority == "legacy":
-            authority_q = Q(
-                rfc_metadata__stream=authority,
-                rfc_metadata__area_assignment="",
-            )
-        elif authority in ["iab", "ise", "irtf", "editorial"]:
-            authority_q = Q(rfc_metadata__stream=authority)
-        else:
-            authority_q = Q(
-                rfc_metadata__area_acronym=authority,
-                rfc_metadata__area_assignment="",
-            ) | Q(rfc_metadata__area_assignment=authority)
-        count = qs.filter(authority_q).count()
-        results[authority] = count
-    return results
+        errata = errata_as_of(as_of)
+    if statuses is not None:
+        errata = errata.filter(status_id__in=statuses)
+    if erratum_types is not None:
+        errata = errata.filter(erratum_type_id__in=erratum_types)
+    counts = dict.fromkeys(AUTHORITIES, 0)
+    counts.update(
+        errata.filter(rfc_metadata__authority__in=AUTHORITIES)
+        .order_by()
+        .values_list("rfc_metadata__authority")
+        .annotate(count=Count("pk"))
+    )
+    return counts
+
+
+def counts_per_authority(as_of: datetime.datetime = None):
+    """Return a JSON object of counts of errata by authority as of a given date."""
+    return count_errata_per_authority(
+        statuses=["reported"], erratum_types=["technical"], as_of=as_of
+    )
@@ -5,11 +5,13 @@ import logging
 import json
 import urllib.parse
 
-from django.http import Http404, JsonResponse
+from django.conf import settings
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import condition, require_GET
 
 from errata.utils_api import requires_api_token
 from errata_auth.utils import role_required
@@ -17,6 +19,7 @@ from errata_auth.utils import role_required
 from .forms import (
     EditErratumForm,
     EditStagedErratumForm,
+    ErrataSearchApiForm,
     ErrataSearchForm,
     ChooseRfcForm,
     ConfirmExistingErrataReadForm,
@@ -33,9 +36,20 @@ from .models import (
     StagedErratumStatus,
     Status,
 )
-from .search import filter_staged_errata, search_errata
+from .search import (
+    cached_search_errata,
+    errata_generation,
+    filter_staged_errata,
+    search_errata,
+    suggest_names,
+)
 from .tasks import update_rfc_metadata_task
-from .utils import can_classify, unverified_errata
+from .utils import (
+    can_classify,
+    iter_errata_json,
+    iter_errata_json_entries,
+    unverified_errata,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -44,11 +58,117 @@ def user_info(request):
     return render(request, "errata/user_info.html")
 
 
+def _name_suggestions(request, form):
+    """Return (name, url) pairs for similar names to a name search that failed"""
+    result = []
+    for field in ("submitter_name", "verifier_name"):
+        if form.cleaned_data.get(field):
+            for name in suggest_names(field, form.cleaned_data[field]):
+                params = request.GET.copy()
+                params[field] = name
+                params.pop("after", None)
+                result.append((name, f"?{params.urlencode()}"))
+    return result
+
+
+# Deploys change the pages without changing the errata; without a release
+# name, when this process started marks the deployed code
+_PROCESS_STARTED = datetime.datetime.now(datetime.UTC)
+
+
+def _request_errata_generation(request):
+    """Return errata_generation(), read at most once per request"""
+    if not hasattr(request, "_errata_generation"):
+        request._errata_generation = errata_generation()
+    return request._errata_generation
+
+
+def _public_page_last_modified(request, *args, **kwargs):
+    """Return when a public page last changed, for a conditional GET
+
+    That is the errata generation, or the start of the process if later. Pages
+    shown to signed-in users include role-dependent actions, so they are
+    always rendered; None disables the conditional response.
+    """
+    if request.user.is_authenticated:
+        return None
+    generation = _request_errata_generation(request)
+    if generation is None:
+        return None
+    return max(generation, _PROCESS_STARTED)
+
+
+def _public_page_etag(request, *args, **kwargs):
+    if _public_page_last_modified(request) is None:
+        return None
+    release = settings.ERRATA_RELEASE or _PROCESS_STARTED.isoformat()
+    # Last-Modified has a resolution of a second, the generation does not
+    return f"{release}:{_request_errata_generation(request).isoformat()}"
+
+
+def _erratum_page_last_modified(request, pk):
+    """Like _public_page_last_modified(), but None for a missing erratum
+
+    So that the 404 of a missing erratum is never answered with a 304.
+    """
+    if request.user.is_authenticated:
+        return None
+    if not hasattr(request, "_erratum_exists"):
+        request._erratum_exists = Erratum.objects.filter(pk=pk).exists()
+    if not request._erratum_exists:
+        return None
+    return _public_page_last_modified(request)
+
+
+def _erratum_page_etag(request, pk):
+    if _erratum_page_last_modified(request, pk) is None:
+        return None
+    return _public_page_etag(request)
+
+
+def _revalidated_page(etag_func, last_modified_func):
+    """Return a decorator answering conditional GETs of a page
+
+    The page must be revalidated on every use: without Cache-Control, a cache
+    may reuse a response with a Last-Modified for a while without asking.
+    """
+
+    conditional = condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+    def decorator(view):
+        return cache_control(no_cache=True)(conditional(view))
+
+    return decorator
+
+
+# Answers anonymous conditional GETs with a 304 until errata or RFC metadata
+# change, or a new release is deployed, without rendering templates
+public_page = _revalidated_page(_public_page_etag, _public_page_last_modified)
+erratum_page = _revalidated_page(_erratum_page_etag, _erratum_page_last_modified)
+
+
 @require_GET
+@public_page
 def search(request):
     form = ErrataSearchForm(request.GET)
+    status_counts = {}
+    next_url = None
+    first_url = None
+    did_you_mean = []
     if form.is_bound and form.is_valid() and request.GET != {}:
-        errata = search_errata(form)
+        errata, next_cursor, status_counts = cached_search_errata(
+            form, request.GET.get("after"), _request_errata_generation(request)
+        )
+        if next_cursor is not None:
+            params = request.GET.copy()
+            params["after"] = next_cursor
+            next_url = f"?{params.urlencode()}"
+        if request.GET.get("after"):
+            params = request.GET.copy()
+            params.pop("after")
+            first_url = f"?{params.urlencode()}"
+        if len(status_counts) == 0:
+            did_you_mean = _name_suggestions(request, form)
         template = (
             "errata/list.html"
             if form.cleaned_data.get("presentation") == "table"
@@ -60,15 +180,27 @@ def search(request):
         template = "errata/list.html"
         search_ran = False
     return render(
-        request, template, dict(errata=errata, form=form, search_ran=search_ran)
+        request,
+        template,
+        dict(
+            errata=errata,
+            form=form,
+            search_ran=search_ran,
+            status_counts=status_counts,
+            next_url=next_url,
+            first_url=first_url,
+            did_you_mean=did_you_mean,
+        ),
     )
 
 
 @require_GET
+@erratum_page
 def detail(request, pk):
-    erratum = Erratum.objects.prefetch_related(
-        "rfc_metadata", "status", "erratum_type"
-    ).get(pk=pk)
+    erratum = get_object_or_404(
+        Erratum.objects.prefetch_related("rfc_metadata", "status", "erratum_type"),
+        pk=pk,
+    )
     return render(request, "errata/detail.html", dict(erratum=erratum))
 
 
@@ -386,7 +518,7 @@ def reported_classify(request, erratum_id: int):
     # of a 400 if the status isn't reported.
     erratum = get_object_or_404(Erratum, id=erratum_id, status_id="reported")
     # Make sure this user can manipulate this erratum
-    if not can_classify(request.user, erratum_id):
+    if not can_classify(request.user, erratum):
         raise Http404
     if request.method == "POST":
         form = EditErratumForm(data=request.POST, instance=erratum)
@@ -475,6 +607,29 @@ def rpc_force_metadata_update_accepted(request):
     return render(request, "errata/rpc_force_metadata_update_accepted.html")
 
 
+@require_GET
+def api_search(request):
+    """Stream the errata matching a search in the errata.json format
+
+    Takes the parameters of the search page, plus "fields" to select keys and
+    "format": "ndjson" (the default) for one erratum per line, or "json" for
+    a list. Rows are read in chunks and sent as they are read.
+    """
+    form = ErrataSearchApiForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+    # only flat values are read
+    errata = search_errata(form).prefetch_related(None)
+    entries = iter_errata_json_entries(errata, form.cleaned_data["fields"])
+    if form.cleaned_data["format"] == "json":
+        return StreamingHttpResponse(
+            iter_errata_json(entries), content_type="application/json"
+        )
+    return StreamingHttpResponse(
+        (f"{entry}\n" for entry in entries), content_type="application/x-ndjson"
+    )
+
+
 @requires_api_token
 @csrf_exempt
 def api_rfc_metadata_update(request):
@@ -34,6 +34,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_bootstrap5",
     "django_celery_beat",
     "rules.apps.AutodiscoverRulesConfig",
@@ -138,7 +139,13 @@ STATIC_ROOT = BASE_DIR / "static"
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
-    }
+    },
+    # Search results, see errata.search.cached_search_errata(). Entries are
+    # keyed on the errata generation, so stale ones are never read back.
+    "search": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "errata-search",
+    },
 }
 
 # email - disabled in base config
@@ -263,6 +270,15 @@ STORAGES = {
 
 DEFAULT_REQUESTS_TIMEOUT = 10
 
+# The deployed release, e.g. the image's package version. Part of the ETags of
+# public pages so that a deploy invalidates them; when blank, the time the
+# process started is used instead.
+ERRATA_RELEASE = os.getenv("ERRATA_RELEASE", "")
+
+# Number of threads fetching red_doc_list pages during an RFC metadata sync;
+# 1 fetches the pages one after another
+RFC_METADATA_FETCH_WORKERS = 1
+
 BOOTSTRAP5 = {
     "css_url": "/static/css/bootstrap.min.css",
     "javascript_url": "/static/js/bootstrap.bundle.min.js",
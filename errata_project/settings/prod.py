@@ -4,7 +4,7 @@ from base64 import b64decode
 import botocore.config
 
 from .base import *  # noqa
-from .base import STORAGES, STORAGE_BUCKETS
+from .base import CACHES, STORAGES, STORAGE_BUCKETS
 from email.utils import parseaddr
 import json
 import os
@@ -154,6 +154,19 @@ for _bucket in STORAGE_BUCKETS:
 
 DEFAULT_REQUESTS_TIMEOUT = int(os.environ.get("ERRATA_DEFAULT_REQUESTS_TIMEOUT", "10"))
 
+RFC_METADATA_FETCH_WORKERS = int(
+    os.environ.get("ERRATA_RFC_METADATA_FETCH_WORKERS", "4")
+)
+
+# Search results are cached per process unless a shared cache is configured,
+# e.g. ERRATA_SEARCH_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+_search_cache_backend = os.environ.get("ERRATA_SEARCH_CACHE_BACKEND", None)
+if _search_cache_backend is not None:
+    CACHES["search"] = {
+        "BACKEND": _search_cache_backend,
+        "LOCATION": os.environ.get("ERRATA_SEARCH_CACHE_LOCATION", ""),
+    }
+
 # Guard to ensure insecure development APP_API_TOKENS value is replaced for production
 try:
     del APP_API_TOKENS
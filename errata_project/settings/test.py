@@ -1,6 +1,6 @@
 # Copyright The IETF Trust 2025-2026, All Rights Reserved
 from .base import *  # noqa
-from .base import STORAGES, STORAGE_BUCKETS
+from .base import CACHES, STORAGES, STORAGE_BUCKETS
 import os
 
 DATABASES = {
@@ -33,6 +33,9 @@ DEPLOYMENT_MODE = "development"
 
 BASE_URL = "http://localhost:8808"
 
+# Tests that exercise the search cache enable it with override_settings
+CACHES["search"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+
 # email
 EMAIL_BACKEND = "django.core.mail.backends.dummy.EmailBackend"
 